@@ -7,6 +7,8 @@ To reproduce the values and plots in my report, run the scripts in the following
 2. lab1_2_Q3.py
 '''
 
+from functools import lru_cache
+
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -14,7 +16,201 @@ import matplotlib.pyplot as plt
 sigma = 5.67e-8 #Units: W/m2/K4
 
 #---------> Define all the functions
-def n_layer_atmos(nlayers, epsilon=1,albedo=0.33,s0=1350, debug = False):
+def build_coef_matrix(nlayers, epsilon=1):
+    '''
+    Assemble the coefficient matrix A of the n-layer energy balance model with broadcasting instead of a nested loop. The emissivity can differ from layer to layer; the transmission between two levels is then the cumulative product of (1-epsilon) over the layers in between. A batch of emissivity profiles gives a stack of matrices.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    epsilon: float or float array
+        The emissivity of each layer, ranging between 0 and 1. Either a single value for all layers or a profile of length N (bottom layer first). A batch of profiles has shape (batch, N); a batch of single values has shape (batch, 1).
+
+    Return
+    ----------------
+    A: float array
+        Coefficient matrix of shape (N+1, N+1), or (batch, N+1, N+1) for a batch of emissivities.
+    '''
+    eps = np.atleast_1d(np.asarray(epsilon, dtype=float))
+    eps = np.broadcast_to(eps, eps.shape[:-1] + (nlayers,))
+    lev = np.arange(nlayers+1)
+
+    #---------> The surface (level 0) absorbs everything that reaches it:
+    emis = np.concatenate([np.ones(eps.shape[:-1] + (1,)), eps], axis=-1)
+    trans = 1 - emis
+
+    #---------> trans_prod[i, k] = product of (1-epsilon) over the layers i+1 to k:
+    trans_prod = np.cumprod(np.where(lev[None, :] > lev[:, None], trans[..., None, :], 1.), axis=-1)
+
+    #---------> Transmission between levels i < j is the product over layers i+1 to j-1:
+    T = np.zeros(trans_prod.shape)
+    T[..., :, 1:] = np.triu(trans_prod[..., :, :-1])
+    T = T + np.swapaxes(T, -1, -2)
+
+    #---------> Row i absorbs epsilon_i of what reaches it and emits twice (once for the surface):
+    A = emis[..., :, None]*T
+    A[..., lev, lev] = -2
+    A[..., 0, 0] = -1
+
+    return A
+
+def n_layer_atmos_batch(nlayers, epsilon=1, albedo=0.33, s0=1350):
+    '''
+    Solve the n-layer atmosphere energy balance problem for a whole grid of parameters in one call. All coefficient matrices are assembled with broadcasting and solved together with one stacked `np.linalg.solve`, so the Python overhead is paid once rather than once per parameter combination.
+
+    Parameters
+    ----------------
+    nlayers: int or int array
+        The number of layers. An array gives one layer count per batch member; members with fewer layers than the largest are padded with zero fluxes above their top layer.
+    epsilon: float or float array
+        The emissivity of the atmospheric layers, ranging between 0 and 1. One value per batch member, used for all its layers.
+    albedo: float or float array
+        The albedo or reflectivity of the planetary surface, ranging between 0 and 1.
+    s0: float or float array
+        Incoming solar radiation flux in W/m^2.
+    All four parameters are broadcast against each other to give the batch shape.
+
+    Return
+    ----------------
+    fluxes: float array
+        The radiation fluxes of the surface and each atmospheric layer, with shape (batch, N+1) where N is the largest layer count.
+    '''
+    nlayers, epsilon, albedo, s0 = np.broadcast_arrays(nlayers, epsilon, albedo, s0)
+    batch = nlayers.shape
+    nlayers = nlayers.ravel().astype(int)
+    nmax = nlayers.max()
+
+    #---------> Stack of N+1xN+1 coefficient matrices, one for each member:
+    A = build_coef_matrix(nmax, epsilon.ravel()[:, None])
+    b = np.zeros([nlayers.size, nmax+1])
+    b[:, 0] = -(1./4.)*s0.ravel()*(1-albedo.ravel())
+
+    #---------> Pad members with fewer layers with an identity block (zero flux):
+    lev = np.arange(nmax+1)
+    pad = lev[None, :] > nlayers[:, None]
+    A[pad[:, :, None] | pad[:, None, :]] = 0
+    A[:, lev, lev] = np.where(pad, 1, A[:, lev, lev])
+
+    #---------> Solve every system at once:
+    fluxes = np.linalg.solve(A, b[..., None])[..., 0]
+
+    return fluxes.reshape(batch + (nmax+1,))
+
+def n_layer_recurrence(nlayers, epsilon=1, forcing=None):
+    '''
+    Solve the n-layer energy balance in O(N) time and memory without building the coefficient matrix.
+
+    In equilibrium every layer emits as much as it absorbs, so the net upward longwave flux between two levels equals the shortwave absorbed below them. Starting from zero downwelling radiation at the top of the atmosphere, this gives the downwelling flux D_k above each level as a cumulative sum from the top:
+        g_k = (epsilon*C_(k-1) + f_k)/(2-epsilon),    D_(k-1) = D_k + g_k
+    where f_k is the shortwave absorbed by level k and C_k the total absorbed at or below level k. The emitted fluxes are then F_k = epsilon*D_k + g_k for the layers and F_0 = D_0 + f_0 for the surface. The result is identical to solving A*F=b with the dense matrix.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    epsilon: float or float array
+        The emissivity of each layer, ranging between 0 and 1. Either one value, a profile of length N, or a batch of profiles with shape (batch, N).
+    forcing: float vector or array
+        Shortwave flux in W/m^2 absorbed by the surface and each layer (length N+1), i.e. -b. A batch of forcing vectors with shape (batch, N+1) is solved at once. Default is 1 W/m^2 absorbed at the surface.
+
+    Return
+    ----------------
+    fluxes: float vector or array
+        The calculated radiation fluxes of Earth surface and each atmospheric layer, shape (N+1,) or (batch, N+1).
+    '''
+    if forcing is None:
+        forcing = np.zeros(nlayers+1)
+        forcing[0] = 1.
+    forcing = np.asarray(forcing, dtype=float)
+
+    #---------> A batch can come from the forcing, the emissivity profiles, or both:
+    epsilon = np.asarray(epsilon, dtype=float)
+    batch = np.broadcast_shapes(forcing.shape[:-1], epsilon.shape[:-1] if epsilon.ndim else ())
+    forcing = np.broadcast_to(forcing, batch + (nlayers+1,))
+
+    #---------> Shortwave absorbed at or below each level:
+    absorbed = np.cumsum(forcing, axis=-1)
+    g = (epsilon*absorbed[..., :-1] + forcing[..., 1:])/(2-epsilon)
+
+    #---------> Downwelling flux above each level (zero at the top):
+    down = np.zeros(forcing.shape)
+    down[..., :-1] = np.cumsum(g[..., ::-1], axis=-1)[..., ::-1]
+
+    fluxes = np.empty(forcing.shape)
+    fluxes[..., 0] = down[..., 0] + forcing[..., 0]
+    fluxes[..., 1:] = epsilon*down[..., 1:] + g
+
+    return fluxes
+
+@lru_cache(maxsize=64)
+def lu_coef_matrix(nlayers, epsilon=1):
+    '''
+    LU factorization of the coefficient matrix A. A only depends on the number of layers and the emissivity, so the factorization is kept in an LRU cache keyed on (nlayers, epsilon) and reused whenever s0, albedo or the absorption profile change.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    epsilon: float or tuple of floats
+        The emissivity of each layer, ranging between 0 and 1. A per-layer profile must be passed as a tuple so that it can be used as a cache key (see `emissivity_key`).
+
+    Return
+    ----------------
+    lu_piv: tuple
+        The (lu, piv) pair from `scipy.linalg.lu_factor`, to be passed to `scipy.linalg.lu_solve`. Both arrays are read-only since they are shared by the cache.
+    '''
+    from scipy.linalg import lu_factor
+
+    lu, piv = lu_factor(build_coef_matrix(nlayers, epsilon))
+    lu.setflags(write=False)
+    piv.setflags(write=False)
+    return lu, piv
+
+@lru_cache(maxsize=64)
+def n_layer_response(nlayers, epsilon=1):
+    '''
+    Unit-forcing response vectors of the n-layer model. Column k holds the fluxes produced by 1 W/m^2 of shortwave absorbed at level k (k=0 is the surface, k=N the top layer). The fluxes are linear in the forcing, so any combination of s0, albedo and absorption profile is a single mat-vec:
+        fluxes = R @ forcing,    e.g. forcing[0] = s0*(1-albedo)/4 for `n_layer_atmos`
+    A time series of s0 at fixed emissivity is then `np.outer(R[:, 0], s0*(1-albedo)/4)`.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    epsilon: float or tuple of floats
+        The emissivity of each layer, ranging between 0 and 1, as in `lu_coef_matrix`.
+
+    Return
+    ----------------
+    R: float matrix
+        Read-only (N+1)x(N+1) response matrix, cached on (nlayers, epsilon).
+    '''
+    from scipy.linalg import lu_solve
+
+    R = lu_solve(lu_coef_matrix(nlayers, epsilon), -np.eye(nlayers+1))
+    R.setflags(write=False)
+    return R
+
+def emissivity_key(epsilon):
+    '''
+    Turn an emissivity (a single value or a per-layer profile) into a hashable key for the factorization cache.
+
+    Parameters
+    ----------------
+    epsilon: float or float vector
+        The emissivity of each layer.
+
+    Return
+    ----------------
+    key: float or tuple of floats
+    '''
+    eps = np.asarray(epsilon, dtype=float)
+    if eps.ndim == 0:
+        return float(eps)
+    return tuple(eps.tolist())
+
+def n_layer_atmos(nlayers, epsilon=1,albedo=0.33,s0=1350, debug = False, method='inverse'):
     '''
     Solve the n-layer atomsphere energy balance problem in terms of fluxes rather than temperatures. This function returns the flux in W/m^2 at each layer.
 
@@ -22,14 +218,16 @@ def n_layer_atmos(nlayers, epsilon=1,albedo=0.33,s0=1350, debug = False):
     ----------------
     nlayers: int
         The number of layers.
-    epsilon: float
-        The emissivity of each layer, ranging between 0 and 1. Assumed to be the same in all atmospheric layer in this problem. The default value is 1, meaning the layer acts like a black body - 100% absorbing and emitting all the radiation with no transmission.
+    epsilon: float or float vector
+        The emissivity of each layer, ranging between 0 and 1. Assumed to be the same in all atmospheric layer in this problem unless a per-layer profile of length N (bottom layer first) is given. The default value is 1, meaning the layer acts like a black body - 100% absorbing and emitting all the radiation with no transmission.
     albedo: float
         The albedo or reflectivity of the planetary surface, ranging between 0 and 1. The default value is set to be 0.33, approximately the real albedo of the Earth.
     s0: float
         Incoming solar radiation flux in W/m^2. The default value is 1350 W/m^2.
     debug: bool
         When it is set to be true, it will print out elements in matrix A.
+    method: string
+        'inverse' (default) builds and inverts the dense matrix A. 'recurrence' uses the structure of A to get the fluxes in linear time and memory (see `n_layer_recurrence`), which allows very deep atmospheres. 'cached' reuses the LU factorization of A for this (nlayers, epsilon) (see `n_layer_response`), so changing only s0 or albedo costs one mat-vec.
     A: float matrix
         Coefficient matrix for the n-layer energy balance model. The number of rows represents the surface and atmospheric layers. Each column represents a flux term from each layer. The full set of energy balance equation is A*F=b. Negative value means outgoing; positive value is incoming.
     b: float vector
@@ -42,27 +240,11 @@ def n_layer_atmos(nlayers, epsilon=1,albedo=0.33,s0=1350, debug = False):
     fluxes: float vector
         The calculated radiation fluxes of Earth surface and each atmospheric layer.
     '''
-    #---------> Create array of coefficients, an N+1xN+1 array:
-    A = np.zeros([nlayers+1, nlayers+1])
-    b = np.zeros(nlayers+1)
-    #---------> Populate based on our model:
-    for i in range(nlayers+1):
-        for j in range(nlayers+1):
-            if i == 0 and j != 0:
-                A[i,j] = (1-epsilon)**(j-1)
-            elif i == j:
-                A[i, j] = -2
-            else:
-                expon = np.abs(i-j)-1
-                A[i, j] = epsilon*(1-epsilon)**expon
-    A[0,0] = -1
-    b[0] = -(1./4.)*s0*(1-albedo)
+    #---------> All the solar radiation is absorbed by the surface:
+    absorb = np.zeros(nlayers+1)
+    absorb[0] = 1
 
-    #---------> Invert matrix:
-    Ainv = np.linalg.inv(A)
-
-    #---------> Get solution:
-    fluxes = np.matmul(Ainv, b) # Note our use of matrix    multiplication!
+    fluxes = n_layer_general(nlayers, absorb, epsilon, albedo, s0, method=method)
 
     #---------> Debug
     if debug == True:
@@ -73,6 +255,64 @@ def n_layer_atmos(nlayers, epsilon=1,albedo=0.33,s0=1350, debug = False):
 
     return fluxes
 
+def n_layer_general(nlayers, absorb, epsilon=1, albedo=0.33, s0=1350, method='cached'):
+    '''
+    Solve the n-layer atmosphere energy balance problem for an arbitrary vertical profile of shortwave absorption. `n_layer_atmos` (all absorbed by the surface) and `n_layer_nuclear_winter` (all absorbed by the top layer) are the two extremes; aerosol and smoke scenarios lie in between. A batch of absorption profiles is solved against a single factorization of A.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    absorb: float vector or array
+        Fraction of the incoming (1-albedo) shortwave absorbed by the surface and each layer, length N+1 (surface first). A batch of profiles has shape (batch, N+1).
+    epsilon: float or float array
+        The emissivity of each layer, ranging between 0 and 1. Either one value, a profile of length N, or a batch of profiles with shape (batch, N). A batch of emissivity profiles is assembled and solved as a stack of matrices by 'cached' and 'inverse'.
+    albedo: float or float array
+        The albedo or reflectivity of the planet, ranging between 0 and 1. An array gives one albedo per profile in the batch.
+    s0: float or float array
+        Incoming solar radiation flux in W/m^2. An array gives one value per profile in the batch.
+    method: string
+        'cached' (default) reuses the cached factorization for (nlayers, epsilon), 'recurrence' uses the linear-time solver, and 'inverse' inverts the dense matrix A.
+
+    Return
+    ----------------
+    fluxes: float vector or array
+        The calculated radiation fluxes of Earth surface and each atmospheric layer, with the same shape as `absorb`.
+    '''
+    absorb = np.asarray(absorb, dtype=float)
+    if absorb.shape[-1] != nlayers+1:
+        raise ValueError(f'absorb needs {nlayers+1} levels, got {absorb.shape[-1]}.')
+
+    #---------> Absorbed shortwave at each level, i.e. -b:
+    solar = (1./4.)*np.asarray(s0, dtype=float)*(1-np.asarray(albedo, dtype=float))
+    forcing = solar[..., None]*absorb
+
+    if method == 'recurrence':
+        #---------> Linear time and memory; A is never built:
+        fluxes = n_layer_recurrence(nlayers, epsilon, forcing)
+    elif np.ndim(epsilon) > 1 and method in ('cached', 'inverse'):
+        #---------> One matrix per emissivity profile, solved as a stack:
+        A = build_coef_matrix(nlayers, epsilon)
+        batch = np.broadcast_shapes(forcing.shape[:-1], A.shape[:-2])
+        A = np.broadcast_to(A, batch + A.shape[-2:])
+        forcing = np.broadcast_to(forcing, batch + forcing.shape[-1:])
+        fluxes = np.linalg.solve(A, -forcing[..., None])[..., 0]
+    elif method == 'cached':
+        #---------> One cached factorization, all profiles as right-hand sides:
+        fluxes = np.matmul(forcing, n_layer_response(nlayers, emissivity_key(epsilon)).T)
+    elif method == 'inverse':
+        A = build_coef_matrix(nlayers, epsilon)
+
+        #---------> Invert matrix:
+        Ainv = np.linalg.inv(A)
+
+        #---------> Get solution:
+        fluxes = np.matmul(-forcing, Ainv.T)
+    else:
+        raise ValueError(f"Unknown method '{method}'; use 'inverse', 'recurrence' or 'cached'.")
+
+    return fluxes
+
 #---------> Convert fluxes to temperature!
 def Stefan_Boltzmann(flux, epsilon=1):
     '''
@@ -80,24 +320,26 @@ def Stefan_Boltzmann(flux, epsilon=1):
 
     Parameters
     ----------------
-    flux: float vector
-        Fluxes of the surface and each layer in W/m^2.
-    epsilon: float
-        The emissivity of each layer, ranging between 0 and 1. Assumed to be the same in all atmospheric layer in this problem. The default value is 1, meaning the layer acts like a black body - 100% absorbing and emitting all the radiation with no transmission.
+    flux: float vector or array
+        Fluxes of the surface and each layer in W/m^2. A batch of flux vectors with shape (batch, N+1) is converted in one pass.
+    epsilon: float or float array
+        The emissivity of each layer, ranging between 0 and 1. Either one value for all layers, a profile of length N, or one profile per batch member with shape (batch, N); use shape (batch, 1) for one value per member. The default value is 1, meaning the layer acts like a black body - 100% absorbing and emitting all the radiation with no transmission.
 
         
     Return
     ----------------
-    Temp: float vector
-        The calculated temperatures of Earth surface and each atmospheric layer.
+    Temp: float vector or array
+        The calculated temperatures of Earth surface and each atmospheric layer, with the same shape as `flux`.
     '''
-    Temp = (flux/sigma/epsilon)**(1./4.)
+    flux = np.asarray(flux, dtype=float)
+    Temp = np.empty(flux.shape)
+    Temp[..., 1:] = (flux[..., 1:]/sigma/epsilon)**(1./4.)
     #---------> Assume Earth is a blackbody
-    Temp[0] = (flux[0]/sigma/1)**(1./4.)
+    Temp[..., 0] = (flux[..., 0]/sigma/1)**(1./4.)
     return Temp
 
 #---------> N-layer Atmosphere Problem for Nuclear Winter
-def n_layer_nuclear_winter(nlayers, epsilon=1,albedo_toa=0,s0=1350, debug = False):
+def n_layer_nuclear_winter(nlayers, epsilon=1,albedo_toa=0,s0=1350, debug = False, method='inverse'):
     '''
     Solve the n-layer atomsphere energy balance problem in terms of fluxes for nuclear winter case, which the top of atmosphere absorbs all incoming solar radiation. This function returns the flux in W/m^2 at each layer.
 
@@ -105,14 +347,16 @@ def n_layer_nuclear_winter(nlayers, epsilon=1,albedo_toa=0,s0=1350, debug = Fals
     ----------------
     nlayers: int
         The number of layers.
-    epsilon: float
-        The emissivity of each layer, ranging between 0 and 1. Assumed to be the same in all atmospheric layer in this problem. The default value is 1, meaning the layer acts like a black body - 100% absorbing and emitting all the radiation with no transmission.
+    epsilon: float or float vector
+        The emissivity of each layer, ranging between 0 and 1. Assumed to be the same in all atmospheric layer in this problem unless a per-layer profile of length N (bottom layer first) is given. The default value is 1, meaning the layer acts like a black body - 100% absorbing and emitting all the radiation with no transmission.
     albedo: float
         The albedo or reflectivity of the planetary surface, ranging between 0 and 1. The default value is set to be 0.33, approximately the real albedo of the Earth.
     s0: float
         Incoming solar radiation flux in W/m^2. The default value is 1350 W/m^2.
     debug: bool
         When it is set to be true, it will print out elements in matrix A.
+    method: string
+        'inverse' (default) builds and inverts the dense matrix A. 'recurrence' uses the structure of A to get the fluxes in linear time and memory (see `n_layer_recurrence`), which allows very deep atmospheres. 'cached' reuses the LU factorization of A for this (nlayers, epsilon) (see `n_layer_response`), so changing only s0 or albedo costs one mat-vec.
     A: float matrix
         Coefficient matrix for the n-layer energy balance model. The number of rows represents the surface and atmospheric layers. Each column represents a flux term from each layer. The full set of energy balance equation is A*F=b. Negative value means outgoing; positive value is incoming.
     b: float vector
@@ -125,34 +369,262 @@ def n_layer_nuclear_winter(nlayers, epsilon=1,albedo_toa=0,s0=1350, debug = Fals
     fluxes: float vector
         The calculated radiation fluxes of Earth surface and each atmospheric layer.
     '''
-    #---------> Create array of coefficients, an N+1xN+1 array:
-    A = np.zeros([nlayers+1, nlayers+1])
-    b = np.zeros(nlayers+1)
-    #---------> Populate based on our model:
-    for i in range(nlayers+1):
-        for j in range(nlayers+1):
-            if i == 0 and j != 0:
-                A[i,j] = (1-epsilon)**(j-1)
-            elif i == j:
-                A[i, j] = -2
-            else:
-                expon = np.abs(i-j)-1
-                A[i, j] = epsilon*(1-epsilon)**expon
-    A[0,0] = -1
-    b[-1] = -(1./4.)*s0*(1-albedo_toa) # the top layer absorbs all the solar radiation
-
-    #---------> Invert matrix:
-    Ainv = np.linalg.inv(A)
+    #---------> The top layer absorbs all the solar radiation:
+    absorb = np.zeros(nlayers+1)
+    absorb[-1] = 1
 
-    #---------> Get solution:
-    fluxes = np.matmul(Ainv, b) # Note our use of matrix    multiplication!
+    fluxes = n_layer_general(nlayers, absorb, epsilon, albedo_toa, s0, method=method)
 
     #---------> Debug
     if debug == True:
         nn = 5
         ee = 0.5
-        print(b)
+        print(-(1./4.)*s0*(1-albedo_toa)*absorb)
         print(n_layer_atmos(nn,epsilon=ee))
         print(Stefan_Boltzmann(n_layer_nuclear_winter(nn,epsilon=ee),ee))
 
-    return fluxes
\ No newline at end of file
+    return fluxes
+
+#---------> Inverse problem: which parameter gives a target temperature?
+def n_layer_inverse(target_temp, solve_for='epsilon', nlayers=1, epsilon=1, albedo=0.33, s0=1350, x0=None, bracket=None, method='recurrence', xtol=1e-12):
+    '''
+    Find the emissivity, albedo, or smallest number of layers for which the n-layer model reproduces a target temperature. A surface temperature is matched exactly with bracketed root finding (Brent's method); a full temperature profile is matched in the least-squares sense. The parameter being solved for is ignored in the inputs.
+
+    Parameters
+    ----------------
+    target_temp: float or float vector
+        Target surface temperature in K, or a target profile (surface and each layer, length N+1).
+    solve_for: string
+        Parameter to solve for: 'epsilon', 'albedo' or 'nlayers'.
+    nlayers, epsilon, albedo, s0:
+        Fixed model parameters, as in `n_layer_atmos`.
+    x0: float or int
+        Warm start. For 'epsilon' and 'albedo' the root is bracketed by expanding outward from x0 instead of searching the whole range [0,1]. For 'nlayers' the search starts at x0 layers. Default is None.
+    bracket: tuple of floats
+        Interval known to contain the answer for 'epsilon' or 'albedo'. Default is (0, 1).
+    method: string
+        Solver used by `n_layer_atmos` for each model evaluation. With 'cached', the factorization for a fixed (nlayers, epsilon) is reused across the whole search (and across repeated calls).
+    xtol: float
+        Absolute tolerance of the answer for 'epsilon' and 'albedo'.
+
+    Return
+    ----------------
+    value: float or int
+        The matching epsilon or albedo, or the smallest number of layers (0 for a bare surface) whose surface temperature reaches the target.
+    '''
+    from scipy.optimize import brentq, minimize_scalar
+
+    target_temp = np.asarray(target_temp, dtype=float)
+
+    def model_temp(nn, ee, aa, surface=False):
+        fluxes = n_layer_atmos(nn, epsilon=ee, albedo=aa, s0=s0, method=method)
+        if surface:
+            return (fluxes[0]/sigma)**(1./4.)
+        return Stefan_Boltzmann(fluxes, ee)
+
+    #---------> Smallest layer count: grow the bracket by doubling, then bisect on integers
+    if solve_for == 'nlayers':
+        if target_temp.ndim != 0:
+            raise ValueError('Solving for nlayers needs a scalar surface temperature.')
+        def too_cold(nn):
+            return model_temp(nn, epsilon, albedo, surface=True) < target_temp
+        if not too_cold(0):
+            return 0
+        lo = 0
+        hi = max(int(x0), 1) if x0 is not None else 1
+        if x0 is not None and hi > 1 and not too_cold(hi-1):
+            hi, lo = hi - 1, 0
+        while too_cold(hi):
+            lo = hi
+            hi *= 2
+            if hi > 2**24:
+                raise ValueError(f'No layer count reaches {target_temp} K.')
+        while hi - lo > 1:
+            mid = (lo + hi)//2
+            if too_cold(mid):
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    if solve_for == 'epsilon':
+        def model(x, surface=False): return model_temp(nlayers, x, albedo, surface)
+    elif solve_for == 'albedo':
+        def model(x, surface=False): return model_temp(nlayers, epsilon, x, surface)
+    else:
+        raise ValueError(f"Unknown solve_for '{solve_for}'; use 'epsilon', 'albedo' or 'nlayers'.")
+    lo, hi = (0., 1.) if bracket is None else bracket
+
+    #---------> Match a whole profile in the least-squares sense
+    if target_temp.ndim != 0:
+        result = minimize_scalar(lambda x: np.sum((model(x) - target_temp)**2), bounds=(lo, hi), method='bounded', options={'xatol': xtol})
+        return result.x
+
+    #---------> Match the surface temperature exactly
+    def residual(x):
+        return model(x, surface=True) - target_temp
+
+    if x0 is not None:
+        #---------> Expand outward from the warm start until the sign changes
+        step = 1e-3*(hi - lo)
+        a, b = max(lo, x0 - step), min(hi, x0 + step)
+        while residual(a)*residual(b) > 0 and (a > lo or b < hi):
+            step *= 4
+            a, b = max(lo, x0 - step), min(hi, x0 + step)
+        lo, hi = a, b
+
+    if residual(lo)*residual(hi) > 0:
+        raise ValueError(f'The target of {target_temp} K is not reachable with {solve_for} in [{lo}, {hi}].')
+
+    return brentq(residual, lo, hi, xtol=xtol)
+
+
+#---------> Time-dependent response to a forcing series
+def n_layer_transient(nlayers, s0=1350, dt=86400., nsteps=None, epsilon=1, albedo=0.33, absorb=None, heat_cap=None, temp_init=None, relin_tol=1.):
+    '''
+    Integrate the n-layer atmosphere in time, so that the surface and layer temperatures relax towards equilibrium with a finite heat capacity:
+        C dT/dt = A*F(T) - b(t),    F_k(T) = epsilon_k*sigma*T_k^4
+    Each step is linearly implicit (backward Euler with a linearized emission term), which is stable for time steps far longer than the radiative relaxation time. The operator C/dt - A*dF/dT is factorized once and reused across steps; it is only re-linearized when the temperatures drift more than `relin_tol` from the state it was built around.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    s0: float or float vector
+        Incoming solar radiation flux in W/m^2. A vector gives the value during each time step (e.g. a yearly solar record interpolated to daily resolution).
+    dt: float
+        Time step in seconds. Default is one day.
+    nsteps: int
+        Number of time steps. Default is the length of `s0`.
+    epsilon: float or float vector
+        The emissivity of each layer, ranging between 0 and 1, or a per-layer profile of length N.
+    albedo: float or float vector
+        The albedo of the planet, constant or one value per time step.
+    absorb: float vector
+        Fraction of the shortwave absorbed by the surface and each layer (see `n_layer_general`). Default is all at the surface.
+    heat_cap: float or float vector
+        Heat capacity of the surface and each layer in J/m^2/K. Default is a 50 m ocean mixed layer (2.1e8) for the surface and the column heat capacity of the atmosphere (1.0e7) divided evenly among the layers.
+    temp_init: float vector
+        Initial temperatures of the surface and each layer in K. Default is the equilibrium for the first value of s0 and albedo.
+    relin_tol: float
+        Largest temperature change in K before the implicit operator is rebuilt. Default is 1 K.
+
+    Return
+    ----------------
+    time: float vector
+        Time in seconds, length nsteps+1.
+    Temp: float array
+        Temperatures of the surface and each layer at each time, shape (nsteps+1, N+1).
+    '''
+    from scipy.linalg import lu_factor, lu_solve
+
+    s0 = np.atleast_1d(np.asarray(s0, dtype=float))
+    if nsteps is None:
+        nsteps = s0.size
+    s0 = np.broadcast_to(s0, (nsteps,))
+    albedo = np.broadcast_to(np.asarray(albedo, dtype=float), (nsteps,))
+    if absorb is None:
+        absorb = np.zeros(nlayers+1)
+        absorb[0] = 1
+
+    #---------> Emissivity of every level (the surface is a blackbody):
+    emis = np.ones(nlayers+1)
+    emis[1:] = epsilon
+    if heat_cap is None:
+        heat_cap = np.full(nlayers+1, 1.0e7/max(nlayers, 1))
+        heat_cap[0] = 4.2e6*50.
+    heat_cap = np.broadcast_to(np.asarray(heat_cap, dtype=float), (nlayers+1,))
+
+    #---------> Absorbed shortwave at each level and step, i.e. -b:
+    forcing = (1./4.)*(s0*(1-albedo))[:, None]*np.asarray(absorb, dtype=float)
+
+    A = build_coef_matrix(nlayers, epsilon)
+    time = dt*np.arange(nsteps+1)
+    Temp = np.zeros([nsteps+1, nlayers+1])
+    if temp_init is None:
+        Temp[0] = Stefan_Boltzmann(n_layer_recurrence(nlayers, epsilon, forcing[0]), epsilon)
+    else:
+        Temp[0] = temp_init
+
+    temp_lin = None
+    for n in range(nsteps):
+        T = Temp[n]
+
+        #---------> Rebuild the implicit operator only once the state has drifted:
+        if temp_lin is None or np.max(np.abs(T - temp_lin)) > relin_tol:
+            temp_lin = T.copy()
+            dFdT = 4*emis*sigma*temp_lin**3
+            lu_piv = lu_factor(np.diag(heat_cap/dt) - A*dFdT[None, :])
+
+        #---------> Net heating (W/m^2) at each level, then one implicit step:
+        heating = np.matmul(A, emis*sigma*T**4) + forcing[n]
+        Temp[n+1] = T + lu_solve(lu_piv, heating)
+
+    return time, Temp
+
+
+#---------> Exact derivatives of the equilibrium state
+def n_layer_sensitivity(nlayers, epsilon=1, albedo=0.33, s0=1350, absorb=None):
+    '''
+    Solve the n-layer atmosphere and return the exact derivatives of every flux and temperature with respect to epsilon, albedo and s0. Differentiating A*F=b gives
+        A dF/dp = db/dp - (dA/dp) F
+    so all derivatives reuse the cached factorization of A: one multi right-hand-side solve for F, dF/ds0 and dF/dalbedo, and one more for dF/depsilon. This replaces finite differencing, which needs extra solves per parameter and is only approximate.
+
+    Parameters
+    ----------------
+    nlayers: int
+        The number of layers.
+    epsilon: float
+        The emissivity of all atmospheric layers, ranging between 0 and 1. A single value only; per-layer profiles are not supported here.
+    albedo: float
+        The albedo of the planet, ranging between 0 and 1.
+    s0: float
+        Incoming solar radiation flux in W/m^2.
+    absorb: float vector
+        Fraction of the shortwave absorbed by the surface and each layer (see `n_layer_general`). Default is all at the surface, as in `n_layer_atmos`.
+
+    Return
+    ----------------
+    fluxes: float vector
+        The radiation fluxes of Earth surface and each atmospheric layer.
+    Temp: float vector
+        The temperatures of Earth surface and each atmospheric layer.
+    sens: dict
+        Derivatives keyed by 'flux' and 'temp'; each holds a dict of vectors keyed by 'epsilon', 'albedo' and 's0' (e.g. sens['temp']['epsilon'] is dT/depsilon in K per unit emissivity). The temperature derivatives are nan where a flux is 0 (e.g. layers with epsilon = 0, whose temperature is undefined).
+    '''
+    from scipy.linalg import lu_solve
+
+    if absorb is None:
+        absorb = np.zeros(nlayers+1)
+        absorb[0] = 1
+    absorb = np.asarray(absorb, dtype=float)
+    if np.ndim(epsilon) != 0:
+        raise ValueError(f'n_layer_sensitivity needs one emissivity for all layers, got shape {np.shape(epsilon)}.')
+    epsilon = float(epsilon)
+
+    #---------> Right-hand sides b, db/ds0 and db/dalbedo, solved together:
+    rhs = np.stack([-(1./4.)*s0*(1-albedo)*absorb, -(1./4.)*(1-albedo)*absorb, (1./4.)*s0*absorb], axis=1)
+    lu_piv = lu_coef_matrix(nlayers, epsilon)
+    fluxes, dF_ds0, dF_dalb = lu_solve(lu_piv, rhs).T
+
+    #---------> dA/depsilon: rows are epsilon*(1-epsilon)**m, the surface row (1-epsilon)**m
+    lev = np.arange(nlayers+1)
+    m = np.maximum(np.abs(lev[:, None] - lev[None, :]) - 1, 0)
+    trans = (1-epsilon)**m
+    dtrans = np.where(m > 0, -m*(1-epsilon)**np.maximum(m-1, 0), 0.)
+    dA = trans + epsilon*dtrans
+    dA[0, :] = dtrans[0, :]
+    dA[lev, lev] = 0
+    dF_deps = lu_solve(lu_piv, -np.matmul(dA, fluxes))
+
+    #---------> Chain rule through Stefan-Boltzmann, T = (F/sigma/epsilon)**(1/4), undefined where F = 0:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Temp = Stefan_Boltzmann(fluxes, epsilon)
+        dT_dF = np.where(fluxes > 0, Temp/(4*fluxes), np.nan)
+        dT_deps = dT_dF*dF_deps
+        dT_deps[1:] -= Temp[1:]/(4*epsilon)
+
+    sens = {'flux': {'epsilon': dF_deps, 'albedo': dF_dalb, 's0': dF_ds0},
+            'temp': {'epsilon': dT_deps, 'albedo': dT_dF*dF_dalb, 's0': dT_dF*dF_ds0}}
+
+    return fluxes, Temp, sens
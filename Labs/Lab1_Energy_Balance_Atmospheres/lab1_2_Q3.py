@@ -13,7 +13,7 @@ Plot : Altitude versus temperature to produce an altitude profile of the modeled
 
 import numpy as np
 import matplotlib.pyplot as plt
-from lab1_1_nlayer import n_layer_atmos, Stefan_Boltzmann
+from lab1_1_nlayer import n_layer_atmos, n_layer_atmos_batch, n_layer_inverse, Stefan_Boltzmann
 
 #---------------------------------------------------------------
 # 3-1: run the model for a range of emissivities and then plot surface temperature versus emissivity
@@ -21,11 +21,9 @@ from lab1_1_nlayer import n_layer_atmos, Stefan_Boltzmann
 
 n_3_1 = 1
 emit_3_1 = np.linspace(0,1,101)
-temp_3_1 = np.zeros([len(emit_3_1), n_3_1+1])
 
-#---------> Looping through the epsilons
-for ii in range(len(emit_3_1)):
-  temp_3_1[ii,:] = Stefan_Boltzmann(n_layer_atmos(1, epsilon=emit_3_1[ii]))
+#---------> Solve all the epsilons in one batched call
+temp_3_1 = Stefan_Boltzmann(n_layer_atmos_batch(n_3_1, epsilon=emit_3_1))
 
 #---------> Plot surface temperature vs. emissivity
 fig1, ax1 = plt.subplots(figsize=(16,10))
@@ -42,7 +40,7 @@ fig1.show()
 
 #---------> Find the emissivity when temperature is 288 K
 temp_288 = 288
-emit_at_288 = np.interp(temp_288, temp_3_1[:,0], emit_3_1)
+emit_at_288 = n_layer_inverse(temp_288, solve_for='epsilon', nlayers=n_3_1)
 #---------> Print the statement
 print(f'For an average Earth surface temperature of 288 K, the predicted value by the model for the emissivity of Earth’s atmosphere is about {emit_at_288:.2f}.')
 # plt.close()
@@ -17,13 +17,13 @@ def dNdt_pypdt(t, N, a=1, b=2, c=1, d=3):
     t : float
         The current time (not used here).
     N : two-element list
-        The current value of N1 and N2 as a list (e.g., [N1, N2]).
-    a, b, c, d : float, defaults = 1, 2, 1, 3
-        The value of the Lotka-Volterra coefficients.
+        The current value of N1 and N2 as a list (e.g., [N1, N2]). N1 and N2 may also be arrays holding every member of an ensemble.
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients. Arrays must broadcast against N1 and N2.
 
     Returns
     -------
-    dN1dt, dN2dt : floats
+    dN1dt, dN2dt : floats or arrays
         The time derivatives of `N1` and `N2`.
     '''
 
@@ -41,13 +41,13 @@ def dNdt_comp(t, N, a=1, b=2, c=1, d=3):
     t : float
         The current time (not used here).
     N : two-element list
-        The current value of N1 and N2 as a list (e.g., [N1, N2]).
-    a, b, c, d : float, defaults = 1, 2, 1, 3
-        The value of the Lotka-Volterra coefficients.
+        The current value of N1 and N2 as a list (e.g., [N1, N2]). N1 and N2 may also be arrays holding every member of an ensemble.
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients. Arrays must broadcast against N1 and N2.
 
     Returns
     -------
-    dN1dt, dN2dt : floats
+    dN1dt, dN2dt : floats or arrays
         The time derivatives of `N1` and `N2`.
     '''
 
@@ -62,37 +62,45 @@ def euler_solve(func, N1_init=.5, N2_init=.5, dt=.1, t_final=100.0, **kwargs):
         f(t+dt) = f(t0) + dt*f'(t+dt) + (1/2)*dt^2*f''(t+dt) + ...
     for Lotka-Volterra competition and prey-predator equations.
     Extra kwargs are passed to the functions
+
+    Initial conditions and coefficients may be arrays, in which case a whole ensemble is integrated at once: every member is advanced with one array operation per step, so ten thousand trajectories cost about the same Python overhead as one.
     
     Parameters
     ----------
     func : function
         A python function that takes `time`, [`N1`, `N2`] as inputs and
         returns the time derivative of N1 and N2.
-    N1_init : float, default = 0.5
+    N1_init : float or array, default = 0.5
         Initial normalized population of a species, ranging from (0,1].
-    N2_init : float, default = 0.5
+    N2_init : float or array, default = 0.5
         Initial normalized population of a second species, ranging from (0,1].
     dt : float, default = 0.1
         Increment of time
     t_final : float, default = 100.0
         The final time of the time range.
     **kwargs : any other extra keyword arguments
-        Any other keyword arugments that may not be used in this function but in the input function.
+        Any other keyword arugments that may not be used in this function but in the input function. Array coefficients (e.g., a=np.linspace(1, 4, 100)) define ensemble members.
 
     Returns
     ----------
     time : Numpy array
         The time array
     N1 : Numpy array
-        The population of N1 species over time.
+        The population of N1 species over time, shape (members, steps) for an ensemble.
     N2 : Numpy array
-        The population of N2 species over time.
+        The population of N2 species over time, shape (members, steps) for an ensemble.
     '''
 
     # Configure our problem:
     time = np.arange(0,t_final,dt)
-    N1 = np.zeros(time.size)
-    N2 = np.zeros(time.size)
+
+    # Ensemble shape from the initial conditions and any array coefficients
+    members = np.broadcast_shapes(np.shape(N1_init), np.shape(N2_init),
+                                  *[np.shape(v) for v in kwargs.values()])
+
+    # Preallocate; time is the first axis so each step writes a contiguous row
+    N1 = np.zeros((time.size,) + members)
+    N2 = np.zeros((time.size,) + members)
     N1[0] = N1_init
     N2[0] = N2_init
 
@@ -102,7 +110,488 @@ def euler_solve(func, N1_init=.5, N2_init=.5, dt=.1, t_final=100.0, **kwargs):
         N1[i] = N1[i-1] + dt * dN1
         N2[i] = N2[i-1] + dt * dN2
 
-    return time, N1, N2
+    # Return as (members, steps); a single run stays a 1D array
+    return time, np.moveaxis(N1, 0, -1), np.moveaxis(N2, 0, -1)
+
+def rk_solve(func, N1_init=.5, N2_init=.5, dt=.1, t_final=100.0, order=4, **kwargs):
+    '''
+    Solve the Lotka-Volterra competition and prey-predator equations with a fixed-step explicit Runge-Kutta method, either the second-order midpoint method or the classic fourth-order method. Same inputs, outputs and ensemble support as `euler_solve`, which is the first-order member of this family.
+
+    Parameters
+    ----------
+    func : function
+        A python function that takes `time`, [`N1`, `N2`] as inputs and
+        returns the time derivative of N1 and N2.
+    N1_init, N2_init : float or array, default = 0.5
+        Initial normalized populations, ranging from (0,1].
+    dt : float, default = 0.1
+        Increment of time
+    t_final : float, default = 100.0
+        The final time of the time range.
+    order : int, default = 4
+        2 for the midpoint method (RK2), 4 for classic RK4.
+    **kwargs : any other extra keyword arguments
+        Passed on to `func`. Array coefficients define ensemble members.
+
+    Returns
+    ----------
+    time : Numpy array
+        The time array
+    N1, N2 : Numpy arrays
+        The populations over time, shape (members, steps) for an ensemble.
+    '''
+    if order not in (2, 4):
+        raise ValueError(f'order must be 2 or 4, got {order}.')
+
+    # Configure our problem:
+    time = np.arange(0,t_final,dt)
+    members = np.broadcast_shapes(np.shape(N1_init), np.shape(N2_init),
+                                  *[np.shape(v) for v in kwargs.values()])
+    N = np.zeros((time.size, 2) + members)
+    N[0, 0] = N1_init
+    N[0, 1] = N2_init
+
+    def f(t, y):
+        return np.array(np.broadcast_arrays(*func(t, y, **kwargs)))
+
+    for i in range(1, time.size):
+        t, y = time[i-1], N[i-1]
+        k1 = f(t, y)
+        if order == 2:
+            N[i] = y + dt*f(t + dt/2, y + dt/2*k1)
+        else:
+            k2 = f(t + dt/2, y + dt/2*k1)
+            k3 = f(t + dt/2, y + dt/2*k2)
+            k4 = f(t + dt, y + dt*k3)
+            N[i] = y + dt/6*(k1 + 2*k2 + 2*k3 + k4)
+
+    return time, np.moveaxis(N[:, 0], 0, -1), np.moveaxis(N[:, 1], 0, -1)
+
+def lv_invariant(N1, N2, a=1, b=2, c=1, d=3):
+    '''
+    The conserved quantity of the predator-prey equations,
+        V = d*N1 - c*ln(N1) + b*N2 - a*ln(N2)
+    which is constant along every exact trajectory (dV/dt = 0), so each closed orbit in the phase diagram is a level set of V.
+
+    Parameters
+    ----------
+    N1, N2 : floats or arrays
+        Prey and predator populations (must be positive).
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    V : float or array
+        The invariant at every point.
+    '''
+    return d*N1 - c*np.log(N1) + b*N2 - a*np.log(N2)
+
+def invariant_drift(N1, N2, a=1, b=2, c=1, d=3):
+    '''
+    Monitor how far a predator-prey trajectory from any solver drifts off its orbit: the relative change of `lv_invariant` from its initial value. The exact solution has zero drift; Euler's method spirals outward and its drift grows steadily.
+
+    Parameters
+    ----------
+    N1, N2 : Numpy arrays
+        Trajectories with time on the last axis (as returned by the solvers).
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients (arrays need a trailing axis to broadcast against time).
+
+    Returns
+    -------
+    drift : Numpy array
+        |V(t) - V(0)| / |V(0)|, same shape as N1.
+    '''
+    V = lv_invariant(N1, N2, a, b, c, d)
+    return np.abs(V - V[..., :1])/np.abs(V[..., :1])
+
+def symplectic_solve(N1_init=.5, N2_init=.5, dt=.1, t_final=100.0, a=1, b=2, c=1, d=3, order=2):
+    '''
+    Solve the predator-prey equations with a structure-preserving integrator. In log variables u = ln(N1), v = ln(N2) the equations are Hamiltonian and separable,
+        du/dt = a - b*exp(v),    dv/dt = d*exp(u) - c,
+    so a symplectic splitting that updates u and v in turn keeps the invariant `lv_invariant` bounded (no outward spiral) and populations positive at any step size. The orbits stay closed with steps 10-50x larger than Euler needs for the same qualitative picture.
+
+    Parameters
+    ----------
+    N1_init, N2_init : float or array, default = 0.5
+        Initial normalized populations (must be positive). Arrays define ensemble members.
+    dt : float, default = 0.1
+        Increment of time
+    t_final : float, default = 100.0
+        The final time of the time range.
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients. Arrays define ensemble members.
+    order : int, default = 2
+        1 for symplectic Euler, 2 for the symmetric Stormer-Verlet splitting.
+
+    Returns
+    ----------
+    time : Numpy array
+        The time array
+    N1, N2 : Numpy arrays
+        The populations over time, shape (members, steps) for an ensemble.
+    '''
+    if order not in (1, 2):
+        raise ValueError(f'order must be 1 or 2, got {order}.')
+
+    # Configure our problem:
+    time = np.arange(0,t_final,dt)
+    members = np.broadcast_shapes(*[np.shape(v) for v in (N1_init, N2_init, a, b, c, d)])
+    u = np.zeros((time.size,) + members)
+    v = np.zeros((time.size,) + members)
+    u[0] = np.log(N1_init)
+    v[0] = np.log(N2_init)
+
+    for i in range(1, time.size):
+        if order == 1:
+            u[i] = u[i-1] + dt*(a - b*np.exp(v[i-1]))
+            v[i] = v[i-1] + dt*(d*np.exp(u[i]) - c)
+        else:
+            u_half = u[i-1] + dt/2*(a - b*np.exp(v[i-1]))
+            v[i] = v[i-1] + dt*(d*np.exp(u_half) - c)
+            u[i] = u_half + dt/2*(a - b*np.exp(v[i]))
+
+    return time, np.moveaxis(np.exp(u), 0, -1), np.moveaxis(np.exp(v), 0, -1)
+
+def phase_density(N1, N2, hist=None, bins=200, xlim=(0, 2), ylim=(0, 2)):
+    '''
+    Accumulate trajectories into a 2-D histogram of the phase plane (prey on x, predator on y). Call it repeatedly with the same `hist` to stream any number of orbits through a fixed bins x bins array, e.g. one ensemble chunk at a time, and render once at the end with `plot_phase_density`. Memory stays bounded by the histogram size no matter how many orbits are added.
+
+    Parameters
+    ----------
+    N1, N2 : Numpy arrays
+        Prey and predator populations, any (matching) shape, e.g. (members, steps).
+    hist : Numpy array, optional
+        Histogram to add to, updated in place. Default is a new zero histogram.
+    bins : int, default = 200
+        Number of bins along each axis when creating a new histogram.
+    xlim, ylim : tuples, defaults = (0, 2)
+        Range of N1 and N2 covered by the histogram; points outside are ignored.
+
+    Returns
+    -------
+    hist : Numpy array
+        Counts with shape (bins, bins), indexed [N2 bin, N1 bin] (ready for imshow).
+    '''
+    if hist is None:
+        hist = np.zeros((bins, bins))
+    ny, nx = hist.shape
+
+    # Bin index of every point; drop those outside the window
+    ix = np.floor((np.ravel(N1) - xlim[0])/(xlim[1] - xlim[0])*nx).astype(np.int64)
+    iy = np.floor((np.ravel(N2) - ylim[0])/(ylim[1] - ylim[0])*ny).astype(np.int64)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+
+    hist += np.bincount(iy[inside]*nx + ix[inside], minlength=nx*ny).reshape(ny, nx)
+    return hist
+
+def plot_phase_density(hist, xlim=(0, 2), ylim=(0, 2), ax=None, cmap='inferno', log=True, title=None):
+    '''
+    Render a histogram from `phase_density` as a phase-density image in a single draw call.
+
+    Parameters
+    ----------
+    hist : Numpy array
+        Accumulated counts from `phase_density`.
+    xlim, ylim : tuples, defaults = (0, 2)
+        The ranges used when accumulating.
+    ax : matplotlib.axes.Axes, optional
+        Existing axes to plot on. If None, a new figure is created.
+    cmap : string, default = 'inferno'
+        Colormap.
+    log : bool, default = True
+        Use a logarithmic color scale, so rarely visited parts of the phase plane remain visible.
+    title : string, optional
+        Title of the plot.
+
+    Returns
+    -------
+    fig, ax : Matplotlib figure & axes objects
+    img : the image created by imshow
+    '''
+    from matplotlib.colors import LogNorm
+
+    if ax is None:
+        fig, ax = plt.subplots(1, 1, figsize=(8, 8))
+    else:
+        fig = ax.figure
+
+    norm = LogNorm(vmin=1, vmax=max(hist.max(), 1)) if log else None
+    img = ax.imshow(np.where(hist > 0, hist, np.nan) if log else hist, origin='lower',
+                    extent=[xlim[0], xlim[1], ylim[0], ylim[1]], aspect='auto', cmap=cmap, norm=norm)
+    ax.set_xlabel('Prey Population (N1)')
+    ax.set_ylabel('Predator Population (N2)')
+    ax.set_title(title)
+    return fig, ax, img
+
+def plot_phase_lines(N1, N2, ax=None, colors=None, **kwargs):
+    '''
+    Draw many phase-diagram trajectories as one LineCollection instead of one `ax.plot` call per trajectory.
+
+    Parameters
+    ----------
+    N1, N2 : Numpy arrays or lists of 1D arrays
+        Trajectories with shape (members, steps), or one array per member when their lengths differ (e.g. from `solve_rk8`).
+    ax : matplotlib.axes.Axes, optional
+        Existing axes to plot on. If None, a new figure is created.
+    colors : color or list of colors, optional
+        One color for all lines or one per member. Default is a rainbow across members.
+    **kwargs : dict, optional
+        Passed to LineCollection (e.g. linewidth, alpha).
+
+    Returns
+    -------
+    fig, ax : Matplotlib figure & axes objects
+    lines : the LineCollection
+    '''
+    from matplotlib.collections import LineCollection
+
+    if ax is None:
+        fig, ax = plt.subplots(1, 1, figsize=(8, 8))
+    else:
+        fig = ax.figure
+
+    if isinstance(N1, (list, tuple)):
+        segments = [np.column_stack((n1, n2)) for n1, n2 in zip(N1, N2)]
+    else:
+        segments = np.stack([np.atleast_2d(N1), np.atleast_2d(N2)], axis=-1)
+    if colors is None:
+        colors = plt.cm.rainbow(np.linspace(0, 1, len(segments)))
+    lines = LineCollection(segments, colors=colors, **kwargs)
+    ax.add_collection(lines)
+    ax.autoscale()
+    ax.set_xlabel('Prey Population (N1)')
+    ax.set_ylabel('Predator Population (N2)')
+    return fig, ax, lines
+
+def rates_pypdt(N, a=1, b=2, c=1, d=3):
+    '''
+    Birth and death rates of the Lotka-Volterra prey-predator equations, such that dN1/dt = birth1 - death1 and dN2/dt = birth2 - death2 reproduce `dNdt_pypdt`. Used by the tau-leaping mode of `stochastic_ensemble`.
+
+    Parameters
+    ----------
+    N : two-element list
+        The current value of N1 and N2 (floats or arrays).
+    a, b, c, d : float, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    birth1, death1, birth2, death2 : floats or arrays
+        The non-negative rates of each process.
+    '''
+    return a*N[0], b*N[0]*N[1], d*N[1]*N[0], c*N[1]
+
+def rates_comp(N, a=1, b=2, c=1, d=3):
+    '''
+    Birth and death rates of the Lotka-Volterra competition equations, such that dN1/dt = birth1 - death1 and dN2/dt = birth2 - death2 reproduce `dNdt_comp`. Used by the tau-leaping mode of `stochastic_ensemble`.
+
+    Parameters
+    ----------
+    N : two-element list
+        The current value of N1 and N2 (floats or arrays).
+    a, b, c, d : float, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    birth1, death1, birth2, death2 : floats or arrays
+        The non-negative rates of each process.
+    '''
+    return a*N[0], a*N[0]**2 + b*N[0]*N[1], c*N[1], c*N[1]**2 + d*N[1]*N[0]
+
+def stochastic_ensemble(func, N1_init=.5, N2_init=.5, dt=.01, t_final=100.0, nmembers=1000,
+method='em', sigma=0.1, volume=1000, threshold=1e-3, seed=None, chunk=100000, **kwargs):
+    '''
+    Integrate a large ensemble of stochastic Lotka-Volterra runs and return streaming statistics over the members instead of their paths. Two kinds of demographic noise are available:
+        'em'  : Euler-Maruyama with multiplicative noise, dN = f(N) dt + sigma*N dW, independently for each species.
+        'tau' : tau-leaping of the birth-death process behind `func` (see `rates_pypdt` and `rates_comp`), with the normalized populations representing counts/`volume`. Each step draws Poisson numbers of births and deaths.
+    In both modes a population that falls below `threshold` is set to zero and stays extinct.
+
+    Members are simulated `chunk` at a time, each chunk with its own random stream spawned from `seed`, and the per-step mean, variance and extinction fractions are merged into running totals (Chan et al. parallel update). Memory therefore scales with the chunk size and the number of time steps, not with `nmembers`, so 10^6 members are no problem.
+
+    Parameters
+    ----------
+    func : function
+        `dNdt_pypdt` or `dNdt_comp` (any derivative function for 'em').
+    N1_init, N2_init : float, defaults = 0.5
+        Initial normalized populations, shared by all members.
+    dt : float, default = 0.01
+        Time step.
+    t_final : float, default = 100.0
+        The final time of the time range.
+    nmembers : int, default = 1000
+        Number of ensemble members.
+    method : string, default = 'em'
+        'em' or 'tau'.
+    sigma : float, default = 0.1
+        Noise amplitude for 'em'.
+    volume : float, default = 1000
+        System size for 'tau', i.e. the number of individuals for N = 1.
+    threshold : float, default = 1e-3
+        Population below which a species counts as extinct.
+    seed : int, optional
+        Seed for reproducible runs. The same seed and chunk size give the same statistics.
+    chunk : int, default = 100000
+        Number of members simulated at once.
+    **kwargs : float
+        Lotka-Volterra coefficients, passed to `func`.
+
+    Returns
+    ----------
+    stats : dict
+        'time' : the time array.
+        'mean_N1', 'mean_N2' : ensemble mean of each population over time.
+        'var_N1', 'var_N2' : ensemble variance of each population over time.
+        'p_extinct_N1', 'p_extinct_N2' : fraction of members in which each species is extinct, over time.
+    '''
+    if method == 'tau':
+        rates = {dNdt_pypdt: rates_pypdt, dNdt_comp: rates_comp}.get(func)
+        if rates is None:
+            raise ValueError("Tau-leaping needs the birth and death rates; use dNdt_pypdt or dNdt_comp.")
+    elif method != 'em':
+        raise ValueError(f"Unknown method '{method}'; use 'em' or 'tau'.")
+
+    time = np.arange(0, t_final, dt)
+    stats = {'time': time}
+    for key in ['mean_N1', 'mean_N2', 'var_N1', 'var_N2', 'p_extinct_N1', 'p_extinct_N2']:
+        stats[key] = np.zeros(time.size)
+    # Sums of squared deviations; divided by the member count at the end
+    m2 = {'N1': np.zeros(time.size), 'N2': np.zeros(time.size)}
+
+    sizes = np.diff(np.r_[0:nmembers:chunk, nmembers])
+    streams = np.random.SeedSequence(seed).spawn(sizes.size)
+    done = 0
+    for m, stream in zip(sizes, streams):
+        rng = np.random.default_rng(stream)
+        N = [np.full(m, float(N1_init)), np.full(m, float(N2_init))]
+
+        for i in range(time.size):
+            if i > 0:
+                if method == 'em':
+                    dN1, dN2 = func(time[i-1], N, **kwargs)
+                    dW = rng.normal(0, np.sqrt(dt), (2, m))
+                    N = [N[0] + dt*dN1 + sigma*N[0]*dW[0], N[1] + dt*dN2 + sigma*N[1]*dW[1]]
+                else:
+                    # Expected events per step, converted to counts and back
+                    lam = np.array(rates(N, **kwargs))*volume*dt
+                    events = rng.poisson(np.maximum(lam, 0))/volume
+                    N = [N[0] + events[0] - events[1], N[1] + events[2] - events[3]]
+                for k in range(2):
+                    N[k][N[k] < threshold] = 0.
+
+            # Merge this chunk's statistics at step i into the running totals
+            for k, name in enumerate(['N1', 'N2']):
+                mean_b = N[k].mean()
+                delta = mean_b - stats['mean_' + name][i]
+                stats['mean_' + name][i] += delta*m/(done + m)
+                m2[name][i] += ((N[k] - mean_b)**2).sum() + delta**2*done*m/(done + m)
+                stats['p_extinct_' + name][i] += np.count_nonzero(N[k] == 0)
+        done += m
+
+    for name in ['N1', 'N2']:
+        stats['var_' + name] = m2[name]/done
+        stats['p_extinct_' + name] /= done
+    return stats
+
+def dNdt_pypdt_delay(t, N, N_lag, a=1, b=2, c=1, d=3):
+    '''
+    Lotka-Volterra prey-predator equations with a maturation delay for the predators: new predators enter the population a time tau after the prey they were raised on was eaten, so
+        dN1/dt = a*N1 - b*N1*N2
+        dN2/dt = -c*N2 + d*N1(t-tau)*N2(t-tau)
+    For use with `dde_euler_solve`, which supplies the delayed state.
+
+    Parameters
+    ----------
+    t : float
+        The current time (not used here).
+    N : two-element list
+        The current value of N1 and N2 (floats or ensemble arrays).
+    N_lag : two-element list
+        The value of N1 and N2 at time t - tau.
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    dN1dt, dN2dt : floats or arrays
+        The time derivatives of `N1` and `N2`.
+    '''
+    dN1dt = a*N[0] - b*N[0]*N[1]
+    dN2dt = -c*N[1] + d*N_lag[1]*N_lag[0]
+    return dN1dt, dN2dt
+
+def dde_euler_solve(func, N1_init=.5, N2_init=.5, dt=.1, t_final=100.0, tau=1., record_every=None, **kwargs):
+    '''
+    Solve a delay differential equation such as `dNdt_pypdt_delay` with Euler's method, the delayed counterpart of `euler_solve`. The history before t = 0 is taken to be the initial condition.
+
+    Only the last tau/dt + 2 states are kept, in a ring buffer indexed by step number, so the working memory per trajectory does not depend on `t_final`; only recording steps with `record_every` makes the output grow with it. The delayed state N(t - tau) is linearly interpolated between the two neighbouring stored steps when tau is not a multiple of dt.
+
+    Parameters
+    ----------
+    func : function
+        A python function that takes `time`, [`N1`, `N2`], [`N1_lag`, `N2_lag`] as inputs and returns the time derivative of N1 and N2.
+    N1_init, N2_init : float or array, defaults = 0.5
+        Initial normalized populations. Arrays define ensemble members.
+    dt : float, default = 0.1
+        Increment of time
+    t_final : float, default = 100.0
+        The final time of the time range.
+    tau : float, default = 1.
+        The delay, shared by all members.
+    record_every : int or None, default = None
+        Keep every `record_every`-th step in the output. The default keeps only the final state, so memory stays constant however long the run; recording steps stores about t_final/(dt*record_every) states per member.
+    **kwargs : float or array
+        Coefficients passed to `func`. Arrays define ensemble members.
+
+    Returns
+    ----------
+    time : Numpy array
+        The times of the recorded steps.
+    N1, N2 : Numpy arrays
+        The recorded populations, shape (members, steps) for an ensemble, as for `euler_solve`.
+    '''
+    if tau < 0:
+        raise ValueError(f'The delay must not be negative, got tau={tau}.')
+
+    time = np.arange(0, t_final, dt)
+    members = np.broadcast_shapes(np.shape(N1_init), np.shape(N2_init),
+                                  *[np.shape(v) for v in kwargs.values()])
+
+    # Ring buffer of recent states: row i % size holds step i
+    lag = tau/dt
+    size = int(np.ceil(lag)) + 2
+    ring = np.zeros((size, 2) + members)
+    ring[0, 0], ring[0, 1] = N1_init, N2_init
+
+    if record_every is None:
+        recorded = np.array([time.size - 1])
+    else:
+        recorded = np.arange(0, time.size, record_every)
+    N1 = np.zeros((recorded.size,) + members)
+    N2 = np.zeros((recorded.size,) + members)
+    irec = 0
+
+    for i in range(time.size):
+        if i > 0:
+            # Delayed state at t_{i-1} - tau; steps before 0 are the initial condition
+            s = max(i - 1 - lag, 0.)
+            j = int(s)
+            w = s - j
+            N_lag = (1 - w)*ring[j % size] + w*ring[min(j + 1, i - 1) % size]
+
+            now = ring[(i-1) % size]
+            dN1, dN2 = func(time[i-1], [now[0], now[1]], [N_lag[0], N_lag[1]], **kwargs)
+            ring[i % size, 0] = now[0] + dt*dN1
+            ring[i % size, 1] = now[1] + dt*dN2
+
+        if irec < recorded.size and i == recorded[irec]:
+            N1[irec], N2[irec] = ring[i % size]
+            irec += 1
+
+    # Return as (members, steps); a single run stays a 1D array
+    return time[recorded], np.moveaxis(N1, 0, -1), np.moveaxis(N2, 0, -1)
 
 def solve_rk8(func, N1_init=.5, N2_init=.5, dt=10, t_final=100.0,
 a=1, b=2, c=1, d=3):
@@ -143,6 +632,375 @@ a=1, b=2, c=1, d=3):
     # Return values to caller
     return time, N1, N2
 
+def dNdt_glv(t, N, r=None, A=None):
+    '''
+    This function calculates the generalized Lotka-Volterra equations for any number of species,
+        dN_i/dt = N_i * (r_i + sum_j A_ij N_j)
+    with a growth vector `r` and an interaction matrix `A`, using one matrix-vector product per evaluation. The two-species models are special cases: `dNdt_pypdt` is r = [a, -c], A = [[0, -b], [d, 0]] and `dNdt_comp` is r = [a, c], A = [[-a, -b], [-d, -c]]. Like the other derivative functions, `t` is accepted for Scipy's ODE solver but not used.
+
+    Parameters
+    ----------
+    t : float
+        The current time (not used here).
+    N : Numpy array
+        The current populations, shape (S,) for S species. An ensemble can be passed with shape (S, members).
+    r : Numpy array, length S
+        Intrinsic growth (positive) or decline (negative) rate of each species.
+    A : Numpy array or scipy.sparse matrix, shape (S, S)
+        Interaction coefficients; A[i, j] is the effect of species j on the per-capita growth of species i. A sparse matrix keeps large food webs cheap.
+
+    Returns
+    -------
+    dNdt : Numpy array
+        The time derivatives of every species, same shape as `N`.
+    '''
+
+    # Growth vector as a column so that it broadcasts over ensemble members
+    r = np.reshape(r, (-1,) + (1,)*(np.ndim(N)-1))
+    return N * (r + A @ N)
+
+def euler_solve_nd(func, N_init, dt=.1, t_final=100.0, **kwargs):
+    '''
+    Solve a system of any number of species with Euler's method, the same fixed stepping as `euler_solve` but with a single population vector instead of `N1` and `N2`.
+    Extra kwargs are passed to the functions (e.g. r and A for `dNdt_glv`).
+
+    Parameters
+    ----------
+    func : function
+        A python function that takes `time`, `N` as inputs and returns the time derivative of `N`.
+    N_init : Numpy array
+        Initial populations, shape (S,), or (S, members) for an ensemble.
+    dt : float, default = 0.1
+        Increment of time
+    t_final : float, default = 100.0
+        The final time of the time range.
+    **kwargs : any other extra keyword arguments
+        Passed on to `func`.
+
+    Returns
+    ----------
+    time : Numpy array
+        The time array
+    N : Numpy array
+        Populations over time, shape (S, steps) or (S, members, steps).
+    '''
+
+    # Configure our problem:
+    time = np.arange(0,t_final,dt)
+    N_init = np.asarray(N_init, dtype=float)
+    N = np.zeros((time.size,) + N_init.shape)
+    N[0] = N_init
+
+    for i in range(1, time.size):
+        N[i] = N[i-1] + dt * func(time[i], N[i-1], **kwargs)
+
+    return time, np.moveaxis(N, 0, -1)
+
+def solve_rk8_nd(func, N_init, dt=10, t_final=100.0, **kwargs):
+    '''
+    Solve a system of any number of species with Scipy's adaptive step 8th order solver, the counterpart of `solve_rk8` for a single population vector.
+
+    Parameters
+    ----------
+    func : function
+        A python function that takes `time`, `N` as inputs and returns the time derivative of `N`.
+    N_init : Numpy array, length S
+        Initial populations.
+    dt : float, default = 10
+        Largest timestep allowed in years.
+    t_final : float, default = 100
+        Integrate until this value is reached, in years.
+    **kwargs : any other extra keyword arguments
+        Passed on to `func` (e.g. r and A for `dNdt_glv`).
+
+    Returns
+    ----------
+    time : Numpy array
+        Time elapsed in years.
+    N : Numpy array
+        Populations over time, shape (S, steps).
+    '''
+    from scipy.integrate import solve_ivp
+
+    # Configure the initial value problem solver
+    result = solve_ivp(lambda t, N: func(t, N, **kwargs), [0, t_final], N_init,
+    method='DOP853', max_step=dt)
+
+    # Return values to caller
+    return result.t, result.y
+
+def jac_pypdt(t, N, a=1, b=2, c=1, d=3):
+    '''
+    Analytic Jacobian of `dNdt_pypdt`, for implicit solvers such as Radau or BDF.
+
+    Parameters
+    ----------
+    t : float
+        The current time (not used here).
+    N : two-element list
+        The current value of N1 and N2 (floats or ensemble arrays).
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    J11, J12, J21, J22 : floats or arrays
+        The partial derivatives d(dN1/dt)/dN1, d(dN1/dt)/dN2, d(dN2/dt)/dN1 and d(dN2/dt)/dN2.
+    '''
+    J11 = a - b*N[1]
+    J12 = -b*N[0]
+    J21 = d*N[1]
+    J22 = -c + d*N[0]
+    return J11, J12, J21, J22
+
+def jac_comp(t, N, a=1, b=2, c=1, d=3):
+    '''
+    Analytic Jacobian of `dNdt_comp`, for implicit solvers such as Radau or BDF.
+
+    Parameters
+    ----------
+    t : float
+        The current time (not used here).
+    N : two-element list
+        The current value of N1 and N2 (floats or ensemble arrays).
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    J11, J12, J21, J22 : floats or arrays
+        The partial derivatives d(dN1/dt)/dN1, d(dN1/dt)/dN2, d(dN2/dt)/dN1 and d(dN2/dt)/dN2.
+    '''
+    J11 = a*(1-2*N[0]) - b*N[1]
+    J12 = -b*N[0]
+    J21 = -d*N[1]
+    J22 = c*(1-2*N[1]) - d*N[0]
+    return J11, J12, J21, J22
+
+def solve_rk8_batch(func, N1_init=.5, N2_init=.5, dt=10, t_final=100.0,
+method='DOP853', jac=None, t_eval=None, rtol=1e-3, atol=1e-6, **kwargs):
+    '''
+    Solve many Lotka-Volterra runs in a single call of Scipy's ODE solver by stacking every member into one state vector [N1 of all members, N2 of all members]. The right-hand side is evaluated for all members at once (and supports Scipy's `vectorized=True` column evaluation), so the setup and per-step Python callback overhead is paid once instead of once per run.
+
+    Note that all members share the adaptive time steps, and the error norm is taken over the whole stacked state; tighten `rtol`/`atol` if individual members must meet the tolerance on their own.
+
+    Parameters
+    ----------
+    func : function
+        A python function that takes `time`, [`N1`, `N2`] as inputs and
+        returns the time derivative of N1 and N2 (e.g. `dNdt_pypdt`).
+    N1_init, N2_init : float or array
+        Initial conditions for `N1` and `N2`, ranging from (0,1].
+    dt : float, default = 10
+        Largest timestep allowed in years.
+    t_final : float, default = 100
+        Integrate until this value is reached, in years.
+    method : string, default = 'DOP853'
+        Any `solve_ivp` method. For stiff competition regimes use 'Radau' or 'BDF'. 'LSODA' works too but only takes a dense Jacobian, which grows with the square of the number of members.
+    jac : function, optional
+        Analytic Jacobian returning the four partial derivatives (e.g. `jac_pypdt` or `jac_comp`). It is assembled into a sparse block-diagonal matrix for the implicit methods (a dense one for 'LSODA'). Without it, 'Radau' and 'BDF' finite-difference the Jacobian using its known sparsity.
+    t_eval : array, optional
+        Times at which to store the solution. Default is every internal step.
+    rtol, atol : float, defaults = 1e-3, 1e-6
+        Relative and absolute tolerances.
+    **kwargs : float or array
+        Lotka-Volterra coefficients (a, b, c, d). Arrays, together with the initial conditions, define the ensemble members.
+
+    Returns
+    ----------
+    time : Numpy array
+        Time elapsed in years.
+    N1, N2 : Numpy arrays
+        Normalized population density solutions, shape (members, steps).
+    '''
+    from scipy.integrate import solve_ivp
+    from scipy import sparse
+
+    # Flatten every member into one long state vector
+    members = np.broadcast_shapes(np.shape(N1_init), np.shape(N2_init),
+                                  *[np.shape(v) for v in kwargs.values()])
+    nmem = int(np.prod(members))
+    coefs = {k: np.broadcast_to(v, members).ravel() for k, v in kwargs.items()}
+    y0 = np.concatenate([np.broadcast_to(N1_init, members).ravel(),
+                         np.broadcast_to(N2_init, members).ravel()])
+
+    def rhs(t, y):
+        # y is (2*members,) or, for vectorized calls, (2*members, k)
+        N = y.reshape((2, nmem) + y.shape[1:])
+        coef_cols = {k: v.reshape((nmem,) + (1,)*(y.ndim-1)) for k, v in coefs.items()}
+        dN1, dN2 = func(t, N, **coef_cols)
+        return np.concatenate(np.broadcast_arrays(dN1, dN2))
+
+    # Members do not interact, so the Jacobian is made of four diagonal blocks
+    options = {}
+    if jac is not None:
+        def jacobian(t, y):
+            J = [np.broadcast_to(Jk, (nmem,)) for Jk in jac(t, y.reshape(2, nmem), **coefs)]
+            J = sparse.bmat([[sparse.diags(J[0]), sparse.diags(J[1])],
+                             [sparse.diags(J[2]), sparse.diags(J[3])]], format='csc')
+            # LSODA cannot use sparse matrices
+            return J.toarray() if method == 'LSODA' else J
+        options['jac'] = jacobian
+    elif method in ('Radau', 'BDF'):
+        block = sparse.eye(nmem)
+        options['jac_sparsity'] = sparse.bmat([[block, block], [block, block]], format='csc')
+
+    result = solve_ivp(rhs, [0, t_final], y0, method=method, max_step=dt,
+                       t_eval=t_eval, rtol=rtol, atol=atol, vectorized=True, **options)
+
+    # Unstack to (members, steps)
+    nt = result.t.size
+    N1 = result.y[:nmem].reshape(members + (nt,))
+    N2 = result.y[nmem:].reshape(members + (nt,))
+    return result.t, N1, N2
+
+def summarize_run(func, N1_init=.5, N2_init=.5, dt=.1, t_final=100.0, method='euler',
+threshold=1e-3, stop_on_extinction=True, **kwargs):
+    '''
+    Integrate Lotka-Volterra runs while detecting events on the fly, and return a compact summary of each run instead of its trajectory. Detected events are extinction (a population dropping below `threshold`), the peaks and troughs of both populations, and from those the cycle period and amplitude. For large parameter surveys only these numbers need to be kept.
+
+    With method='euler' the detection is streamed alongside an ensemble Euler integration (same stepping as `euler_solve`), keeping only the current state of each member. With method='rk8' each run is integrated with DOP853 and the events are located by `solve_ivp`'s event detection.
+
+    Parameters
+    ----------
+    func : function
+        A python function that takes `time`, [`N1`, `N2`] as inputs and
+        returns the time derivative of N1 and N2.
+    N1_init, N2_init : float or array
+        Initial conditions for `N1` and `N2`. Arrays define ensemble members.
+    dt : float, default = 0.1
+        Time step for 'euler', largest time step for 'rk8'.
+    t_final : float, default = 100.0
+        The final time of the time range.
+    method : string, default = 'euler'
+        'euler' or 'rk8'.
+    threshold : float, default = 1e-3
+        Population below which a species counts as extinct.
+    stop_on_extinction : bool, default = True
+        Stop integrating a run as soon as one species goes extinct.
+    **kwargs : float or array
+        Lotka-Volterra coefficients, passed to `func`. Arrays define ensemble members.
+
+    Returns
+    ----------
+    summary : dict
+        Values with the ensemble shape (or scalars for a single run):
+        'extinct' : which species went extinct first (0 = none, 1 = N1, 2 = N2).
+        't_extinct' : time of the first extinction (nan if none).
+        'n_peaks' : number of N1 maxima.
+        'period' : mean time between N1 maxima (nan if fewer than two).
+        'amplitude_N1', 'amplitude_N2' : half the difference between the latest maximum and minimum (nan if not both found).
+        'N1_final', 'N2_final', 't_end' : state and time where the integration stopped.
+    '''
+    members = np.broadcast_shapes(np.shape(N1_init), np.shape(N2_init),
+                                  *[np.shape(v) for v in kwargs.values()])
+    # Work on at least one member so that masks can be assigned to
+    shape = members or (1,)
+    nan = np.full(shape, np.nan)
+    summary = {'extinct': np.zeros(shape, dtype=int), 't_extinct': nan.copy(),
+               'n_peaks': np.zeros(shape, dtype=int), 'period': nan.copy(),
+               'amplitude_N1': nan.copy(), 'amplitude_N2': nan.copy(),
+               'N1_final': nan.copy(), 'N2_final': nan.copy(), 't_end': nan.copy()}
+    # Latest extrema, indexed [N1 max, N1 min, N2 max, N2 min]
+    extrema = np.full((4,) + shape, np.nan)
+    first_peak = nan.copy()
+    last_peak = nan.copy()
+
+    if method == 'euler':
+        time = np.arange(0, t_final, dt)
+        N1 = np.broadcast_to(N1_init, shape).astype(float)
+        N2 = np.broadcast_to(N2_init, shape).astype(float)
+        running = np.ones(shape, dtype=bool)
+        t_end = np.full(shape, time[-1])
+        dN1, dN2 = np.broadcast_arrays(*func(time[0], [N1, N2], **kwargs))
+
+        for i in range(1, time.size):
+            N1 = np.where(running, N1 + dt*dN1, N1)
+            N2 = np.where(running, N2 + dt*dN2, N2)
+            new1, new2 = func(time[i], [N1, N2], **kwargs)
+
+            # A peak (trough) is where the increment changes from + to - (- to +)
+            for k, (old, new, N) in enumerate([(dN1, new1, N1), (dN2, new2, N2)]):
+                peak = running & (old > 0) & (new <= 0)
+                trough = running & (old < 0) & (new >= 0)
+                extrema[2*k][peak] = N[peak]
+                extrema[2*k+1][trough] = N[trough]
+                if k == 0:
+                    first_peak[peak & np.isnan(first_peak)] = time[i]
+                    last_peak[peak] = time[i]
+                    summary['n_peaks'] += peak
+
+            # Extinction: record the first species to drop below the threshold
+            gone = running & (summary['extinct'] == 0) & ((N1 < threshold) | (N2 < threshold))
+            summary['extinct'][gone] = np.where(N1 < threshold, 1, 2)[gone]
+            summary['t_extinct'][gone] = time[i]
+            if stop_on_extinction:
+                t_end[gone] = time[i]
+                running &= ~gone
+                if not running.any():
+                    break
+            dN1, dN2 = np.broadcast_arrays(new1, new2)
+
+        summary['N1_final'][...] = N1
+        summary['N2_final'][...] = N2
+        summary['t_end'][...] = t_end
+
+    elif method == 'rk8':
+        from scipy.integrate import solve_ivp
+
+        for idx in np.ndindex(*shape):
+            coefs = {k: np.broadcast_to(v, shape)[idx] for k, v in kwargs.items()}
+            y0 = [np.broadcast_to(N1_init, shape)[idx], np.broadcast_to(N2_init, shape)[idx]]
+
+            # Event functions: zero crossings of the populations and their derivatives
+            def ext1(t, y): return y[0] - threshold
+            def ext2(t, y): return y[1] - threshold
+            def slope1(t, y): return func(t, y, **coefs)[0]
+            def slope2(t, y): return func(t, y, **coefs)[1]
+            events = [ext1, ext2]
+            for ev in events:
+                ev.terminal, ev.direction = stop_on_extinction, -1
+            for slope in (slope1, slope2):
+                for direction in (-1, 1):
+                    def ev(t, y, slope=slope): return slope(t, y)
+                    ev.direction = direction
+                    events.append(ev)
+
+            # Only store the final state; everything else comes from the events
+            result = solve_ivp(lambda t, y: func(t, y, **coefs), [0, t_final], y0,
+                               method='DOP853', max_step=dt, t_eval=[t_final], events=events)
+            t_ev, y_ev = result.t_events, result.y_events
+
+            for k in range(2):
+                if t_ev[k].size and (summary['extinct'][idx] == 0 or t_ev[k][0] < summary['t_extinct'][idx]):
+                    summary['extinct'][idx] = k + 1
+                    summary['t_extinct'][idx] = t_ev[k][0]
+            for k in range(4):
+                if t_ev[2+k].size:
+                    extrema[(k,) + idx] = y_ev[2+k][-1, k//2]
+            summary['n_peaks'][idx] = t_ev[2].size
+            if t_ev[2].size:
+                first_peak[idx], last_peak[idx] = t_ev[2][0], t_ev[2][-1]
+
+            if result.status == 1:
+                summary['t_end'][idx] = summary['t_extinct'][idx]
+                final = y_ev[summary['extinct'][idx]-1][0]
+            else:
+                summary['t_end'][idx] = result.t[-1]
+                final = result.y[:, -1]
+            summary['N1_final'][idx], summary['N2_final'][idx] = final
+    else:
+        raise ValueError(f"Unknown method '{method}'; use 'euler' or 'rk8'.")
+
+    # Cycle period and amplitudes from the detected extrema
+    many = summary['n_peaks'] > 1
+    summary['period'][many] = ((last_peak - first_peak)/np.maximum(summary['n_peaks']-1, 1))[many]
+    summary['amplitude_N1'][...] = (extrema[0] - extrema[1])/2
+    summary['amplitude_N2'][...] = (extrema[2] - extrema[3])/2
+
+    # Plain scalars for a single run
+    return {k: v.reshape(members)[()] for k, v in summary.items()}
+
 # for i in range(10):
 #     plt.plot(np.arange(5) + i)
 #     plt.text(5,3.5+i,f"line#{i}")
\ No newline at end of file
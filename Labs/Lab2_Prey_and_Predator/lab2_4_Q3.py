@@ -10,7 +10,7 @@ Plot : the prey species population on the x-axis and the predator species popula
 #---------------------------------------------------------------
 import numpy as np
 import matplotlib.pyplot as plt
-from lab2_1_functions import dNdt_pypdt, dNdt_comp, euler_solve, solve_rk8
+from lab2_1_functions import dNdt_pypdt, dNdt_comp, euler_solve, solve_rk8, plot_phase_lines
 
 #---------------------------------------------------------------
 # 3-1: Varying initial conditions
@@ -24,6 +24,7 @@ ax1, ax2, ax3, ax4 = axs1.ravel()
 
 fig6, axs6 = plt.subplots(2, 2, figsize=(19, 11))
 ax21, ax22, ax23, ax24 = axs6.ravel() 
+phase_6 = {ax: ([], []) for ax in (ax21, ax22, ax23, ax24)}
 
 for i in range(len(init_cond)):
     # ------------> Varying N1 initial condition
@@ -90,43 +91,22 @@ for i in range(len(init_cond)):
     ax4.grid(True)
 
     #----------------------------Phase Diagram------------------------------
-    # ---> Euler: varying N1
-    ax21.plot(N1_E_Q3_N1, N2_E_Q3_N1, color = def_colors[i], linewidth=2, label = f'Initial Population = {init_cond[i]:.2f}')
-    ax21.set_ylim(0, 2.0)
-    ax21.set_xlim(0, 2.0)
-    ax21.set_ylabel('Predator Population (N2)')
-    # ax21.legend(loc='best')
-    ax21.set_title('Predator-Prey Model using Euler: Varying N1')
-    ax21.grid(True)
-
-    # ---> RK8: varying N1
-    ax22.plot(N1_R_Q3_N1, N2_R_Q3_N1, color = def_colors[i], linewidth=2, label = f'Initial Population = {init_cond[i]:.2f}')
-    ax22.set_ylim(0, 2.0)
-    ax22.set_xlim(0, 2.0)
-    ax22.set_ylabel('Predator Population (N2)')
-    ax22.legend(loc='best')
-    ax22.set_title('Predator-Prey Model using RK8: Varying N1')
-    ax22.grid(True)
-
-    # ---> Euler: varying N2
-    ax23.plot(N1_E_Q3_N2, N2_E_Q3_N2, color = def_colors[i], linewidth=2, label = f'Initial Population = {init_cond[i]:.2f}')
-    ax23.set_ylim(0,2.0)
-    ax23.set_xlim(0,2.0)
-    ax23.set_ylabel('Predator Population (N2)')
-    ax23.set_xlabel('Prey Population (N1)')
-    # ax23.legend(loc='best')
-    ax23.set_title('Predator-Prey Model using Euler: Varying N2')
-    ax23.grid(True)
-
-    # ---> RK8: varying N2
-    ax24.plot(N1_R_Q3_N2, N2_R_Q3_N2, color = def_colors[i], linewidth=2, label = f'Initial Population = {init_cond[i]:.2f}')
-    ax24.set_ylim(0,2.0)
-    ax24.set_xlim(0,2.0)
-    ax24.set_ylabel('Predator Population (N2)')
-    ax24.set_xlabel('Prey Population (N1)')
-    ax24.set_title('Predator-Prey Model using RK8: Varying N2')
-    ax24.grid(True)
-
+    # ---> Keep the trajectories; each panel is drawn in one call after the loop
+    for ax, N1, N2 in [(ax21, N1_E_Q3_N1, N2_E_Q3_N1), (ax22, N1_R_Q3_N1, N2_R_Q3_N1),
+                       (ax23, N1_E_Q3_N2, N2_E_Q3_N2), (ax24, N1_R_Q3_N2, N2_R_Q3_N2)]:
+        phase_6[ax][0].append(N1)
+        phase_6[ax][1].append(N2)
+
+#----------------------------Phase Diagram------------------------------
+for ax, title in [(ax21, 'Euler: Varying N1'), (ax22, 'RK8: Varying N1'), (ax23, 'Euler: Varying N2'), (ax24, 'RK8: Varying N2')]:
+    plot_phase_lines(*phase_6[ax], ax=ax, colors=def_colors, linewidth=2)
+    ax.set_ylim(0, 2.0)
+    ax.set_xlim(0, 2.0)
+    ax.set_title(f'Predator-Prey Model using {title}')
+    ax.grid(True)
+for ax in (ax21, ax22):
+    ax.set_xlabel('')   # top row, as before
+ax22.legend(handles=[plt.Line2D([], [], color=def_colors[i], linewidth=2, label=f'Initial Population = {init_cond[i]:.2f}') for i in range(len(init_cond))], loc='best')
 
 fig1.suptitle("How do the initial conditions affect the final result and behavior of the two species?", fontsize=24)
 fig1.text(0.5, 0.94, "Coefficients: a = 1, b = 2, c = 1, d = 3, Δt = 1.0", ha='center', va='top', fontsize=16)
@@ -153,6 +133,7 @@ ax5, ax6, ax7, ax8 = axs2.ravel()
 
 fig5, axs5 = plt.subplots(2, 2, figsize=(19, 11))
 ax17, ax18, ax19, ax20 = axs5.ravel() 
+phase_5 = {ax: ([], []) for ax in (ax17, ax18, ax19, ax20)}
 
 for g in range(len(coef_vary)):
     # ------------> Varying coefficient "a"
@@ -224,43 +205,23 @@ for g in range(len(coef_vary)):
     ax8.grid(True)
 
     #----------------------------Phase Diagram------------------------------
-    # ---> Euler: Varying a
-    ax17.plot(N1_E_Q3_a, N2_E_Q3_a, color = def_colors[g], linewidth=2, label = f'Coefficient = {coef_vary[g]:.2f}')
-    ax17.set_ylim(-0.25,4.0)
-    ax17.set_xlim(0, 20)
-    ax17.set_ylabel('Predator Population (N2)')
-    # ax17.legend(loc='best')
-    ax17.set_title('Predator-Prey Model using Euler: Varying a')
-    ax17.legend(loc='best')
-    ax17.grid(True)
-
-    # ---> Euler: Varying b
-    ax18.plot(N1_E_Q3_b, N2_E_Q3_b, color = def_colors[g], linewidth=2, label = f'Coefficient = {coef_vary[g]:.2f}')
-    ax18.set_ylim(-0.25,4.0)
-    ax18.set_xlim(0, 1.5)
-    ax18.set_ylabel('Predator Population (N2)')
-    ax18.set_title('Predator-Prey Model using Euler: Varying b')
-    ax18.grid(True)
-
-    # ---> Euler: Varying c
-    ax19.plot(N1_E_Q3_c, N2_E_Q3_c, color = def_colors[g], linewidth=2, label = f'Coefficient = {coef_vary[g]:.2f}')
-    ax19.set_ylim(-0.25,4.0)
-    ax19.set_xlim(0, 12)
-    ax19.set_xlabel('Prey Population (N1)')
-    ax19.set_ylabel('Predator Population (N2)')
-    # ax19.legend(loc='best')
-    ax19.set_title('Predator-Prey Model using Euler: Varying c')
-    ax19.grid(True)
-
-    # ---> Euler: Varying d
-    ax20.plot(time_E_Q3_d, N1_E_Q3_d, color = def_colors[g], linewidth=2, label = f'Coefficient = {coef_vary[g]:.2f}')
-    ax20.set_ylim(-0.25,3.0)
-    ax20.set_xlim(0, 25)
-    ax20.set_xlabel('Prey Population (N1)')
-    ax20.set_ylabel('Predator Population (N2)')
-    # ax20.legend(loc='best')
-    ax20.set_title('Predator-Prey Model using Euler: Varying d')
-    ax20.grid(True)
+    # ---> Keep the trajectories; each panel is drawn in one call after the loop
+    for ax, N1, N2 in [(ax17, N1_E_Q3_a, N2_E_Q3_a), (ax18, N1_E_Q3_b, N2_E_Q3_b),
+                       (ax19, N1_E_Q3_c, N2_E_Q3_c), (ax20, N1_E_Q3_d, N2_E_Q3_d)]:
+        phase_5[ax][0].append(N1)
+        phase_5[ax][1].append(N2)
+
+#----------------------------Phase Diagram------------------------------
+for ax, coef, xlim, ylim in [(ax17, 'a', (0, 20), (-0.25, 4.0)), (ax18, 'b', (0, 1.5), (-0.25, 4.0)),
+                             (ax19, 'c', (0, 12), (-0.25, 4.0)), (ax20, 'd', (0, 2.5), (-0.25, 3.0))]:
+    plot_phase_lines(*phase_5[ax], ax=ax, colors=def_colors, linewidth=2)
+    ax.set_ylim(*ylim)
+    ax.set_xlim(*xlim)
+    ax.set_title(f'Predator-Prey Model using Euler: Varying {coef}')
+    ax.grid(True)
+for ax in (ax17, ax18):
+    ax.set_xlabel('')   # top row, as before
+ax17.legend(handles=[plt.Line2D([], [], color=def_colors[g], linewidth=2, label=f'Coefficient = {coef_vary[g]:.2f}') for g in range(len(coef_vary))], loc='best')
 
 fig2.suptitle("How do the coefficient values affect the final result and behavior of the two species using Euler Method?", fontsize=24)
 fig2.text(0.5, 0.94, "Initial N1 = 0.5, Initial N2 = 0.5, Δt = 0.05", ha='center', va='top', fontsize=16)
@@ -280,6 +241,7 @@ ax9, ax10, ax11, ax12 = axs3.ravel()
 
 fig4, axs4 = plt.subplots(2, 2, figsize=(19, 11))
 ax13, ax14, ax15, ax16 = axs4.ravel() 
+phase_4 = {ax: ([], []) for ax in (ax13, ax14, ax15, ax16)}
 
 for k in range(len(coef_vary)):
     # ------------> Varying coefficient "a"
@@ -352,44 +314,21 @@ for k in range(len(coef_vary)):
     ax12.grid(True)
 
     #----------------------------Phase Diagram------------------------------
-    # ---> RK8: Varying a
-    ax13.plot(N1_R_Q3_a, N2_R_Q3_a, color = def_colors[k], linewidth=2, label = f'Coefficient = {coef_vary[k]:.2f}')
-    # ax13.set_ylim(-0.25,2.0)
-    # ax13.set_xlim(0, 40)
-    ax13.set_ylabel('Predator Population (N2)')
-    # ax13.legend(loc='best')
-    ax13.set_title('Predator-Prey Model using RK8: Varying a')
-    ax13.grid(True)
-
-    # ---> RK8: Varying b
-    ax14.plot(N1_R_Q3_b, N2_R_Q3_b, color = def_colors[k], linewidth=2, label = f'Coefficient = {coef_vary[k]:.2f}')
-    # ax14.set_ylim(-0.25,2.0)
-    # ax14.set_xlim(0, 40)
-    ax14.set_ylabel('Predator Population (N2)')
-    # ax14.legend(loc='best')
-    ax14.set_title('Predator-Prey Model using RK8: Varying b')
-    ax14.grid(True)
+    # ---> Keep the trajectories; each panel is drawn in one call after the loop
+    for ax, N1, N2 in [(ax13, N1_R_Q3_a, N2_R_Q3_a), (ax14, N1_R_Q3_b, N2_R_Q3_b),
+                       (ax15, N1_R_Q3_c, N2_R_Q3_c), (ax16, N1_R_Q3_d, N2_R_Q3_d)]:
+        phase_4[ax][0].append(N1)
+        phase_4[ax][1].append(N2)
+
+#----------------------------Phase Diagram------------------------------
+for ax, coef in [(ax13, 'a'), (ax14, 'b'), (ax15, 'c'), (ax16, 'd')]:
+    plot_phase_lines(*phase_4[ax], ax=ax, colors=def_colors, linewidth=2)
+    ax.set_title(f'Predator-Prey Model using RK8: Varying {coef}')
+    ax.grid(True)
+for ax in (ax13, ax14):
+    ax.set_xlabel('')   # top row, as before
+ax16.legend(handles=[plt.Line2D([], [], color=def_colors[k], linewidth=2, label=f'Coefficient = {coef_vary[k]:.2f}') for k in range(len(coef_vary))], loc='best')
 
-    # ---> RK8: Varying c
-    ax15.plot(N1_R_Q3_c, N2_R_Q3_c, color = def_colors[k], linewidth=2, label = f'Coefficient = {coef_vary[k]:.2f}')
-    # ax15.set_ylim(-0.25,2.0)
-    # ax15.set_xlim(0, 40)
-    ax15.set_ylabel('Predator Population (N2)')
-    ax15.set_xlabel('Prey Population (N1)')
-    # ax15.legend(loc='best')
-    ax15.set_title('Predator-Prey Model using RK8: Varying c')
-    ax15.grid(True)
-
-    # ---> RK8: Varying d
-    ax16.plot(N1_R_Q3_d, N2_R_Q3_d, color = def_colors[k], linewidth=2, label = f'Coefficient = {coef_vary[k]:.2f}')
-    # ax16.set_ylim(-0.25,2.0)
-    # ax16.set_xlim(0, 40)
-    ax16.set_ylabel('Predator Population (N2)')
-    ax16.set_xlabel('Prey Population (N1)')
-    # ax16.legend(loc='best')
-    ax16.set_title('Predator-Prey Model using RK8: Varying d')
-    ax16.grid(True)
-    ax16.legend(loc='best')
 fig3.suptitle("How do the coefficient values affect the final result and behavior of the two species using RK8 Method?", fontsize=24)
 fig3.text(0.5, 0.94, "Initial N1 = 0.5, Initial N2 = 0.5, Δt = 0.05", ha='center', va='top', fontsize=16)
 plt.rcParams.update({'font.size': 16})
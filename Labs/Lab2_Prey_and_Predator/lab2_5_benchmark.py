@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+'''
+This file benchmarks the Lab 2 integrators, so that the time step can be chosen from data rather than by trial and error.
+
+Each integrator (Euler, fixed-step RK2 and RK4, and DOP853 through `solve_rk8`) is run on the predator-prey and competition equations over a range of step sizes (`dt` for the fixed-step methods, `max_step` for DOP853). For every run we record the wall time per call (each timing repeats the call until it lasts at least `min_time`, as `timeit.autorange` does, and the best of several such timings is kept) and the maximum error against a tight-tolerance reference solution, and then:
+    1. print a work-precision table,
+    2. plot error versus wall time (plot_lab2_5_work_precision.png),
+    3. with --check, compare against the saved baselines and exit with status 1 on any regression.
+
+The errors are deterministic, so their baseline (lab2_5_benchmark_baseline.json) is committed with the code and a run that became less accurate fails on any machine. Wall times depend on the machine, so the timing baseline (lab2_5_benchmark_timing.json) is kept out of git and recorded locally; a run that became more than twice as slow as the local timing baseline also fails.
+
+Usage:
+    python lab2_5_benchmark.py                      # table and plot only
+    python lab2_5_benchmark.py --check              # also compare with the baselines (exit status 1 on a regression)
+    python lab2_5_benchmark.py --update-baseline    # save the errors and the local timings as the new baselines
+'''
+#---------------------------------------------------------------
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp
+from lab2_1_functions import dNdt_pypdt, dNdt_comp, euler_solve, rk_solve, solve_rk8
+#---------------------------------------------------------------
+
+# ------------> Benchmark set-up (same problem as Question 1, shorter run)
+N1_init, N2_init = 0.3, 0.6
+t_final = 20.0
+models = {'pypdt': dNdt_pypdt, 'comp': dNdt_comp}
+steps = [0.2, 0.1, 0.05, 0.02, 0.01, 0.005]
+integrators = {
+    'Euler': lambda func, dt: euler_solve(func, N1_init, N2_init, dt=dt, t_final=t_final),
+    'RK2': lambda func, dt: rk_solve(func, N1_init, N2_init, dt=dt, t_final=t_final, order=2),
+    'RK4': lambda func, dt: rk_solve(func, N1_init, N2_init, dt=dt, t_final=t_final, order=4),
+    'DOP853': lambda func, dt: solve_rk8(func, N1_init, N2_init, dt=dt, t_final=t_final),
+}
+repeats = 5
+min_time = 0.2   # seconds per timing, so sub-millisecond runs are timed over many calls
+here = os.path.dirname(os.path.abspath(__file__))
+baseline_file = os.path.join(here, 'lab2_5_benchmark_baseline.json')   # errors, committed
+timing_file = os.path.join(here, 'lab2_5_benchmark_timing.json')       # wall times, machine-local
+
+def reference_solution(func):
+    '''
+    Tight-tolerance DOP853 reference with dense output, so it can be evaluated at any solver's time points.
+
+    Parameters
+    ----------
+    func : function
+        `dNdt_pypdt` or `dNdt_comp`.
+
+    Returns
+    ----------
+    sol : OdeSolution
+        Callable reference solution, sol(t) has shape (2, len(t)).
+    '''
+    result = solve_ivp(func, [0, t_final], [N1_init, N2_init], method='DOP853',
+                       rtol=1e-13, atol=1e-14, dense_output=True)
+    return result.sol
+
+def run_benchmark():
+    '''
+    Run every integrator on every model at every step size.
+
+    Returns
+    ----------
+    results : list of dicts
+        One entry per run with keys 'model', 'method', 'dt', 'time' (seconds) and 'error' (max abs error in N1 and N2).
+    '''
+    results = []
+    for model, func in models.items():
+        sol = reference_solution(func)
+        for method, solve in integrators.items():
+            for dt in steps:
+                # Enough calls per timing to reach min_time, then best of `repeats` timings
+                timing = timeit.Timer(lambda: solve(func, dt))
+                number = 1
+                while timing.timeit(number) < min_time:
+                    number *= 2
+                best = min(timing.repeat(repeats, number))/number
+                t, N1, N2 = solve(func, dt)
+                ref = sol(t)
+                error = max(np.abs(N1 - ref[0]).max(), np.abs(N2 - ref[1]).max())
+                results.append({'model': model, 'method': method, 'dt': dt,
+                                'time': best, 'error': float(error)})
+    return results
+
+def compare_baseline(results, baseline, key, tol, atol=0.):
+    '''
+    Find runs whose error or wall time grew by more than `tol` (relative) over the baseline.
+
+    Parameters
+    ----------
+    results, baseline : lists of dicts
+        Output of `run_benchmark`, now and as saved. Baseline entries only need `key` besides 'model', 'method' and 'dt'.
+    key : string
+        'error' or 'time'.
+    tol : float
+        Allowed relative increase, e.g. 0.01 for errors and 1.0 (twice as slow) for wall times.
+    atol : float, default = 0.
+        Allowed absolute increase, so that errors at round-off level do not fail on another platform.
+
+    Returns
+    ----------
+    regressions : list of strings
+        One message per regression; empty if none.
+    '''
+    saved = {(r['model'], r['method'], r['dt']): r[key] for r in baseline}
+    regressions = []
+    for r in results:
+        old = saved.get((r['model'], r['method'], r['dt']))
+        if old is not None and r[key] > (1 + tol)*old + atol:
+            regressions.append(f"{r['model']} {r['method']} dt={r['dt']}: {key} {old:.2e} -> {r[key]:.2e}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Work-precision benchmark of the Lab 2 integrators.')
+    parser.add_argument('--check', action='store_true', help='compare with the baselines, exit status 1 on a regression')
+    parser.add_argument('--update-baseline', action='store_true', help='save the errors and local timings as the new baselines')
+    args = parser.parse_args()
+    if args.check and not os.path.exists(baseline_file):
+        parser.error(f'no error baseline at {baseline_file}; record one with --update-baseline and commit it')
+
+    results = run_benchmark()
+
+    # ------------> Work-precision table
+    print(f"{'model':<6} {'method':<7} {'dt':>6} {'time (s)':>10} {'max error':>10}")
+    for r in results:
+        print(f"{r['model']:<6} {r['method']:<7} {r['dt']:>6} {r['time']:>10.2e} {r['error']:>10.2e}")
+
+    # ------------> Work-precision plot
+    fig, axs = plt.subplots(1, 2, figsize=(16, 7))
+    for ax, model in zip(axs, models):
+        for method in integrators:
+            runs = [r for r in results if r['model'] == model and r['method'] == method]
+            ax.loglog([r['time'] for r in runs], [r['error'] for r in runs], 'o-', linewidth=2, label=method)
+        ax.set_xlabel('Wall time (s)')
+        ax.set_ylabel('Max error')
+        ax.set_title(f'Work-precision: {model}')
+        ax.grid(True)
+        ax.legend(loc='best')
+    plt.rcParams.update({'font.size': 16})
+    fig.savefig("plot_lab2_5_work_precision.png")
+    plt.close()
+
+    # ------------> Baselines
+    if args.update_baseline:
+        with open(baseline_file, 'w') as fout:
+            json.dump([{k: r[k] for k in ('model', 'method', 'dt', 'error')} for r in results], fout, indent=1)
+        with open(timing_file, 'w') as fout:
+            json.dump([{k: r[k] for k in ('model', 'method', 'dt', 'time')} for r in results], fout, indent=1)
+        print(f'Saved baselines to {baseline_file} and {timing_file}')
+    elif args.check:
+        with open(baseline_file) as fin:
+            regressions = compare_baseline(results, json.load(fin), 'error', 0.01, atol=1e-12)
+        if os.path.exists(timing_file):
+            with open(timing_file) as fin:
+                regressions += compare_baseline(results, json.load(fin), 'time', 1.0)
+        else:
+            print(f'No timing baseline at {timing_file}; only errors were compared (record one with --update-baseline).')
+        if regressions:
+            print('Regressions against the baseline:')
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print('No regressions against the baseline.')
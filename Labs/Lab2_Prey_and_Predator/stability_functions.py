@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+'''
+Closed-form fixed points and linear stability of the Lotka-Volterra competition (`dNdt_comp`) and predator-prey (`dNdt_pypdt`) equations from Lab 2.
+
+Every function is vectorized, so the coefficients a, b, c, d can be whole 4-D grids (e.g. from np.meshgrid). `stability_atlas` labels each grid cell with its long-term regime, and flags the borderline (non-hyperbolic) cells where linear analysis is not conclusive and a simulation with `euler_solve`/`solve_rk8` is still needed.
+'''
+
+import numpy as np
+
+# Regime labels returned by stability_atlas
+REGIMES = {0: 'coexistence', 1: 'N1 wins', 2: 'N2 wins', 3: 'bistable', 4: 'cycles', 5: 'other'}
+
+def eig2(J11, J12, J21, J22):
+    '''
+    Eigenvalues of 2x2 matrices in closed form, from the trace and determinant.
+
+    Parameters
+    ----------
+    J11, J12, J21, J22 : floats or arrays
+        The matrix entries. Arrays give one matrix per element.
+
+    Returns
+    -------
+    lam1, lam2 : complex arrays
+        The two eigenvalues, lam1 having the larger real part.
+    '''
+    tr = np.asarray(J11 + J22, dtype=complex)
+    det = J11*J22 - J12*J21
+    root = np.sqrt(tr**2/4 - det)
+    return tr/2 + root, tr/2 - root
+
+def equilibria_comp(a=1, b=2, c=1, d=3):
+    '''
+    Fixed points of the competition equations and the eigenvalues of the Jacobian at each of them.
+
+    Parameters
+    ----------
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    points : dict
+        For each fixed point ('extinct', 'N1_only', 'N2_only', 'coexist') a tuple (N1, N2, lam1, lam2). The coexistence point is N1 = c(b-a)/(bd-ac), N2 = a(d-c)/(bd-ac), and is nan where bd = ac.
+    '''
+    a, b, c, d = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (a, b, c, d)])
+    zero, one = np.zeros(a.shape), np.ones(a.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = b*d - a*c
+        N1c = np.where(denom != 0, c*(b-a)/denom, np.nan)
+        N2c = np.where(denom != 0, a*(d-c)/denom, np.nan)
+
+    points = {}
+    for name, (N1, N2) in {'extinct': (zero, zero), 'N1_only': (one, zero),
+                           'N2_only': (zero, one), 'coexist': (N1c, N2c)}.items():
+        # Jacobian of dNdt_comp at (N1, N2)
+        J11 = a*(1-2*N1) - b*N2
+        J12 = -b*N1
+        J21 = -d*N2
+        J22 = c*(1-2*N2) - d*N1
+        points[name] = (N1, N2) + eig2(J11, J12, J21, J22)
+    return points
+
+def equilibria_pypdt(a=1, b=2, c=1, d=3):
+    '''
+    Fixed points of the predator-prey equations and the eigenvalues of the Jacobian at each of them.
+
+    Parameters
+    ----------
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients.
+
+    Returns
+    -------
+    points : dict
+        For each fixed point ('extinct', 'coexist') a tuple (N1, N2, lam1, lam2). The coexistence point is N1 = c/d, N2 = a/b, with eigenvalues +-i*sqrt(ac): a center surrounded by closed orbits of period about 2*pi/sqrt(ac).
+    '''
+    a, b, c, d = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (a, b, c, d)])
+    zero = np.zeros(a.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        N1c = np.where(d != 0, c/d, np.nan)
+        N2c = np.where(b != 0, a/b, np.nan)
+
+    points = {}
+    for name, (N1, N2) in {'extinct': (zero, zero), 'coexist': (N1c, N2c)}.items():
+        # Jacobian of dNdt_pypdt at (N1, N2)
+        J11 = a - b*N2
+        J12 = -b*N1
+        J21 = d*N2
+        J22 = -c + d*N1
+        points[name] = (N1, N2) + eig2(J11, J12, J21, J22)
+    return points
+
+def stability_atlas(model='comp', a=1, b=2, c=1, d=3, tol=1e-9):
+    '''
+    Classify the long-term behaviour of the competition or predator-prey model for every combination of coefficients, without integrating anything.
+
+    Competition: 'coexistence' if the interior fixed point is positive and stable, 'N1 wins'/'N2 wins' if only (1,0)/(0,1) is stable, 'bistable' if both are (the outcome then depends on the initial conditions), otherwise 'other'.
+    Predator-prey: 'cycles' if the interior fixed point is a center (always the case for positive coefficients), 'coexistence' if it is a stable focus or node, otherwise 'other'.
+
+    Parameters
+    ----------
+    model : string, default = 'comp'
+        'comp' for `dNdt_comp` or 'pypdt' for `dNdt_pypdt`.
+    a, b, c, d : float or array, defaults = 1, 2, 1, 3
+        The value of the Lotka-Volterra coefficients; arrays are broadcast against each other, e.g. a = A[:, None, None, None] for a 4-D atlas.
+    tol : float, default = 1e-9
+        Eigenvalues with |real part| below tol count as zero.
+
+    Returns
+    -------
+    atlas : dict
+        'regime' : int array of REGIMES codes.
+        'borderline' : bool array, True where a relevant eigenvalue has zero real part (or the interior point is degenerate), so that linear analysis is inconclusive and the cell should be simulated.
+        'N1', 'N2' : the interior (coexistence) fixed point.
+        'lam1', 'lam2' : the eigenvalues at the interior fixed point.
+        'period' : linearized cycle period 2*pi/|Im(lam)| ('cycles' cells only; nan elsewhere).
+    '''
+    def stable(lam1, lam2):
+        return (lam1.real < -tol) & (lam2.real < -tol)
+
+    def marginal(lam1, lam2):
+        return (np.abs(lam1.real) <= tol) | (np.abs(lam2.real) <= tol)
+
+    if model == 'comp':
+        pts = equilibria_comp(a, b, c, d)
+        N1, N2, lam1, lam2 = pts['coexist']
+        positive = (N1 > 0) & (N2 > 0)
+        s1 = stable(*pts['N1_only'][2:])
+        s2 = stable(*pts['N2_only'][2:])
+        sc = positive & stable(lam1, lam2)
+
+        regime = np.full(N1.shape, 5)
+        regime[s1 & ~s2] = 1
+        regime[s2 & ~s1] = 2
+        regime[s1 & s2] = 3
+        regime[sc] = 0
+        borderline = (marginal(*pts['N1_only'][2:]) | marginal(*pts['N2_only'][2:])
+                      | (positive & marginal(lam1, lam2)) | np.isnan(N1))
+        period = np.full(N1.shape, np.nan)
+
+    elif model == 'pypdt':
+        pts = equilibria_pypdt(a, b, c, d)
+        N1, N2, lam1, lam2 = pts['coexist']
+        positive = (N1 > 0) & (N2 > 0)
+        center = positive & (np.abs(lam1.real) <= tol) & (np.abs(lam1.imag) > tol)
+
+        regime = np.full(N1.shape, 5)
+        regime[positive & stable(lam1, lam2)] = 0
+        regime[center] = 4
+        # A center is structurally neutral in this model, so it is not borderline
+        borderline = (positive & marginal(lam1, lam2) & ~center) | np.isnan(N1) | np.isnan(N2)
+        with np.errstate(divide='ignore'):
+            period = np.where(center, 2*np.pi/np.abs(lam1.imag), np.nan)
+    else:
+        raise ValueError(f"Unknown model '{model}'; use 'comp' or 'pypdt'.")
+
+    return {'regime': regime, 'borderline': borderline, 'N1': N1, 'N2': N2,
+            'lam1': lam1, 'lam2': lam2, 'period': period}
@@ -3,13 +3,28 @@
 Solve the melting permafrost problem
 '''
 
+import os
 import numpy as np
 import matplotlib.pyplot as plt 
 
-def solve_heat(xstop, tstop, dx, dt, c2, lowerbound = 0, upperbound = 0, set_ic = None):
+def solve_heat(xstop, tstop, dx, dt, c2, lowerbound = 0, upperbound = 0, set_ic = None, method = 'explicit',
+               steady_tol = None, period = 365, return_info = False, output = 'full', output_every = 1,
+               store = None, chunk = 10000):
     '''
     A function for solving the heating equation
 
+    The default explicit (forward-time centred-space) scheme is only stable for dt <= dx^2/(2*c2). The implicit schemes, backward Euler and Crank-Nicolson, are stable for any dt: the tridiagonal system is factorized once (LAPACK gttrf) and each step is a single O(M) back-substitution, so fine grids do not force tiny time steps.
+
+    With `steady_tol`, the run is monitored for steady state: the envelope (min and max at every depth) over each `period` is compared with the previous one, and the integration stops at the end of the first period where no value changed by more than `steady_tol`. The returned arrays then end there.
+
+    The solver itself only keeps the current and next temperature profile; `output` decides what else is stored. 'full' keeps every step (M x N), 'every' every `output_every`-th step, 'final' only the last `period`, and 'reduce' no history at all but the summaries in `info` (envelopes of the last period and a per-period series of active-layer and permafrost depths), so long and fine runs need O(M) memory.
+
+    With `store`, the 'full' or 'every' history is written to disk as the run advances instead of being kept in memory: `store` is a directory that receives `history.npy`, a time-major (nTime x nSpace) memory-mapped array, and `meta.npz` with x, t, c2, the boundary conditions and the number of rows written so far. The metadata is written before the first step and refreshed every `chunk` steps, so a run that is still going (or crashed) can be read too. Read it back lazily with `load_heat_history`.
+
+    Boundary conditions that change with time are evaluated for `chunk` steps at once (see `boundary_series`), so a vectorized function such as `temp_kanger` is called once per chunk rather than once per step. They can also be given directly as an array with one value per time step, or built from tabulated data with `periodic_forcing` and `monthly_forcing`.
+
+    Several scenarios sharing the grid can be run together by giving an array of diffusivities `c2`, a list of boundary conditions (one per scenario), and/or an initial condition with one column per scenario. The state is then an M x S array advanced by one stencil update per step; the implicit schemes factorize one matrix per distinct diffusivity and boundary type. All outputs gain a last axis of size S. With `steady_tol`, the run stops once every scenario meets the test.
+
     Parameter
     --------------
     xstop: int
@@ -20,29 +35,66 @@ def solve_heat(xstop, tstop, dx, dt, c2, lowerbound = 0, upperbound = 0, set_ic
         Distance step size in meter.
     dt: int
         Time step size in day.
-    c2: int
-        Thermal diffusivity in m^2/day.
-    lowerbound: int or function
-        Setting lower boundary condition of temperature in degree. Default is 0.
-    upperbound: int or function
-        Setting upper boundary condition of temperature in degree. Default is 0.
-    set_ic: string
+    c2: int or array
+        Thermal diffusivity in m^2/day. An array gives one value per scenario.
+    lowerbound: int, function, array, None, or a list of these
+        Setting lower boundary condition of temperature in degree: a constant, a function of time in day, an array (or list of numbers) with one value per time step (size N), or None for a zero-gradient (Neumann) boundary. A list or tuple holding at least one function, None or array gives one per scenario (see `scenario_bounds`). Default is 0.
+    upperbound: int, function, array, None, or a list of these
+        Setting upper boundary condition of temperature in degree, same options as `lowerbound`. Default is 0.
+    set_ic: string or array
         Setting the initial condition. 
         'None': Default is None (same as Kangerlussuaq case), where it is all 0s. 
         'validation': for validation case, that is 4*x-4*x**2.
+        An array of size M, or M x S for one initial profile per scenario.
+    method: string
+        Time stepping scheme: 'explicit' (default), 'backward' (backward Euler) or 'crank-nicolson'.
+    steady_tol: float
+        Stop once the envelope changes by less than this many degrees from one period to the next. Default is None (always run to tstop).
+    period: float
+        Length of the forcing cycle in day, used for the steady-state check and the reductions. Default is 365.
+    return_info: bool
+        Also return a dictionary describing the run. Default is False.
+    output: string
+        What to store: 'full' (default), 'every', 'final' or 'reduce' (needs return_info=True).
+    output_every: int
+        Store every `output_every`-th step when output is 'every'. Default is 1.
+    store: string
+        Directory to stream the history to (output 'full' or 'every' only). Default is None (keep it in memory).
+    chunk: int
+        Number of time steps for which time-dependent boundary values are evaluated at once. Default is 10000.
     
     Returns
     --------------
     x, t: 1D Numpy arrays
-        Space and time values, respectively.
+        Space and time values, respectively. `t` holds the times of the stored steps.
     
     U : Numpy array
-        Theh solution of the heat equation, size is nSpace x nTime
+        Theh solution of the heat equation, size is nSpace x nTime (x nScenario). With output='reduce' only the final profile is returned (nSpace x 1). With `store` this is a view of the file on disk.
+
+    info : dict, only if return_info is True
+        'converged': whether the steady-state test was met.
+        'spinup_time': time in day at which it was first met (nan otherwise).
+        'envelope_change': largest envelope change of each period compared to the one before.
+        With output='reduce' also:
+        'summer', 'winter', 'mean': max, min and mean temperature at every depth over the last complete period.
+        'period_end': time at the end of every complete period.
+        'active_layer', 'permafrost_depth': depth of the active layer and of the bottom of the permafrost at the end of every period (see `permafrost_depths`).
+        For several scenarios each entry has a last axis of size S.
     '''
     #Check our stability criterion:
-    dt_max = dx**2 / (2*c2)
-    if dt>dt_max:
-       raise ValueError(f'DANGER:dt = {dt} > dt_max={dt_max}.')
+    c2 = np.asarray(c2, dtype=float)
+    if method == 'explicit':
+        dt_max = dx**2 / (2*c2.max())
+        if dt>dt_max:
+           raise ValueError(f'DANGER:dt = {dt} > dt_max={dt_max}.')
+    elif method not in ('backward', 'crank-nicolson'):
+        raise ValueError(f"Unknown method '{method}'; use 'explicit', 'backward' or 'crank-nicolson'.")
+    if output not in ('full', 'every', 'final', 'reduce'):
+        raise ValueError(f"Unknown output '{output}'; use 'full', 'every', 'final' or 'reduce'.")
+    if output == 'reduce' and not return_info:
+        raise ValueError("output='reduce' keeps its results in info; pass return_info=True.")
+    if store is not None and output not in ('full', 'every'):
+        raise ValueError(f"store needs output 'full' or 'every', got '{output}'.")
 
     # Get grid sizes (plus one to include "0" as well)
     N = int(tstop/dt)+1
@@ -54,37 +106,393 @@ def solve_heat(xstop, tstop, dx, dt, c2, lowerbound = 0, upperbound = 0, set_ic
     t = np.linspace(0, tstop, N)
     x = np.linspace(0, xstop, M)
 
-    # Create solution matrix; set initial condition
-    U = np.zeros([M, N])
-    if set_ic is None:
-        U = np.zeros((M,N))
-    elif set_ic == 'validation':
-        U[:,0] = 4*x-4*x**2
+    # Number of scenarios; a single run is handled as one scenario and squeezed at the end
+    sizes = {c2.size} if c2.ndim else set()
+    for bound in (lowerbound, upperbound):
+        if scenario_bounds(bound):
+            if len(bound) == N:
+                raise ValueError(f'A list of {N} boundary conditions is ambiguous with a series of one value per time step; pass the series as an array.')
+            sizes.add(len(bound))
+    if np.ndim(set_ic) == 2:
+        sizes.add(np.shape(set_ic)[1])
+    if len(sizes) > 1:
+        raise ValueError(f'Inconsistent numbers of scenarios: {sorted(sizes)}.')
+    single = not sizes
+    S = sizes.pop() if sizes else 1
+    c2 = np.broadcast_to(c2, (S,))
+    lowers = list(lowerbound) if scenario_bounds(lowerbound) else [lowerbound]*S
+    uppers = list(upperbound) if scenario_bounds(upperbound) else [upperbound]*S
+    neumann_lower = np.array([b is None for b in lowers])
+    neumann_upper = np.array([b is None for b in uppers])
+
+    # Current and next temperature profiles; set initial condition
+    u = np.zeros((M, S))
+    if isinstance(set_ic, str) and set_ic == 'validation':
+        u[:] = (4*x-4*x**2)[:, None]
+    elif set_ic is not None:
+        u[:] = np.reshape(set_ic, (M, -1))
+    unew = np.zeros((M, S))
+
+    # Storage for the requested output
+    every = output_every if output == 'every' else 1
+    monitor = steady_tol is not None or output == 'reduce'
+    if monitor or output == 'final':
+        nper = int(round(period/dt))
+        if nper < 1:
+            raise ValueError(f'period = {period} is shorter than dt = {dt}.')
+    # Stored time-major (one row per step), so each step writes a contiguous row
+    if output in ('full', 'every'):
+        nout = (N-1)//every + 1
+        if store is None:
+            U = np.zeros((nout, M, S))
+        else:
+            os.makedirs(store, exist_ok=True)
+            disk = np.lib.format.open_memmap(os.path.join(store, 'history.npy'), mode='w+',
+                                             dtype=float, shape=(nout, M) + (() if single else (S,)))
+            U = disk.reshape((nout, M, S))
+            meta = {'x': x, 't': t[::every], 'c2': c2[0] if single else c2, 'dx': dx, 'dt': dt, 'method': method,
+                    'lowerbound': boundary_spec(lowerbound), 'upperbound': boundary_spec(upperbound)}
+            save_heat_meta(store, 0, meta)
+    elif output == 'final':
+        # Ring buffer holding the last period, row j % (nper+1) is step j
+        U = np.zeros((min(nper+1, N), M, S))
+    else:
+        U = None
+    if U is not None:
+        U[0] = u
 
     # Get r
     r = c2*(dt/dx**2)
 
+    # Implicit schemes: factorize the tridiagonal matrix once per distinct r and boundary type
+    if method != 'explicit':
+        theta = 1 if method == 'backward' else 0.5
+        groups = {}
+        for s in range(S):
+            groups.setdefault((r[s], neumann_lower[s], neumann_upper[s]), []).append(s)
+        factors = []
+        for (r_s, neu_lower, neu_upper), cols in groups.items():
+            cols = slice(None) if len(cols) == S else np.array(cols)
+            factors.append((cols, heat_factor(M, r_s, theta, neu_lower, neu_upper)))
+
+    # Online reductions: running envelope of the current period and the completed ones
+    if monitor:
+        env_max, env_min, env_sum = np.full((M, S), -np.inf), np.full((M, S), np.inf), np.zeros((M, S))
+        prev_max, prev_min, prev_mean = None, None, None
+        period_end, active_layer, permafrost = [], [], []
+    changes = []
+    spinup = np.full(S, np.nan)
+    jend = N-1
+
     # Solve our equation
     for j in range(N-1):
-        U[1:M-1, j+1] = (1-2*r)*U[1:M-1,j] + r*(U[2:M,j]+U[:M-2,j])
-        
-        if lowerbound is None: #Neumann
-            U[0, j+1] = U[1, j+1]
-        elif callable(lowerbound):  # is lowerbound a function?
-            U[0, j+1] = lowerbound(t[j+1])
-        else: #Dirichlet/constant
-            U[0, j+1] = lowerbound
-
-        if upperbound is None: #Neumann
-            U[-1, j+1] = U[-2, j+1]
-        elif callable(upperbound):  # is upperbound a function?
-            U[-1, j+1] = upperbound(t[j+1])
-        else: #Dirichlet/constant
-            U[-1, j+1] = upperbound
+        # Boundary values for the next `chunk` steps, one column per scenario (0 for Neumann, not used)
+        k = j % chunk
+        if k == 0:
+            steps = slice(j+1, min(j+1+chunk, N))
+
+            # Make the rows written so far readable from disk
+            if store is not None and j > 0:
+                disk.flush()
+                save_heat_meta(store, j//every + 1, meta)
+            nk = steps.stop - steps.start
+            lower = np.stack([np.zeros(nk) if b is None else boundary_series(b, t[steps], steps) for b in lowers], axis=1)
+            upper = np.stack([np.zeros(nk) if b is None else boundary_series(b, t[steps], steps) for b in uppers], axis=1)
+
+        if method == 'explicit':
+            unew[1:M-1] = (1-2*r)*u[1:M-1] + r*(u[2:M]+u[:M-2])
+
+            # Neumann: copy the neighbour; Dirichlet/function: the boundary value
+            unew[0] = np.where(neumann_lower, unew[1], lower[k])
+            unew[-1] = np.where(neumann_upper, unew[-2], upper[k])
+        else:
+            # Right-hand side: explicit part of the stencil, boundary rows hold the new boundary values (0 for Neumann: U[0]-U[1] = 0)
+            rhs = u.copy()
+            if theta < 1:
+                rhs[1:M-1] += (1-theta)*r*(u[2:M] - 2*u[1:M-1] + u[:M-2])
+            rhs[0] = lower[k]
+            rhs[-1] = upper[k]
+            for cols, lu in factors:
+                unew[:, cols] = heat_solve_factored(lu, rhs[:, cols])
+        u, unew = unew, u
+
+        # Store the new step
+        if output in ('full', 'every'):
+            if (j+1) % every == 0:
+                U[(j+1)//every] = u
+        elif output == 'final':
+            U[(j+1) % U.shape[0]] = u
+
+        if monitor:
+            np.maximum(env_max, u, out=env_max)
+            np.minimum(env_min, u, out=env_min)
+            env_sum += u
+            if (j+1) % nper == 0:
+                period_end.append(t[j+1])
+                depths = permafrost_depths(x, env_max)
+                active_layer.append(depths[0])
+                permafrost.append(depths[1])
+                if prev_max is not None:
+                    changes.append(np.maximum(np.abs(env_max-prev_max).max(axis=0), np.abs(env_min-prev_min).max(axis=0)))
+                prev_max, prev_min, prev_mean = env_max, env_min, env_sum/nper
+                env_max, env_min, env_sum = np.full((M, S), -np.inf), np.full((M, S), np.inf), np.zeros((M, S))
+                if steady_tol is not None and changes:
+                    below = changes[-1] < steady_tol
+                    spinup[below & np.isnan(spinup)] = t[j+1]
+                    if below.all():
+                        jend = j+1
+                        break
+
+    # Drop the unused part after an early stop, and put the output in time order
+    if output in ('full', 'every'):
+        t, U = t[:jend+1:every], np.moveaxis(U[:jend//every+1], 0, 1)
+    elif output == 'final':
+        steps = np.arange(max(jend-nper, 0), jend+1)
+        t, U = t[steps], np.moveaxis(U[steps % U.shape[0]], 0, 1)
+    else:
+        t, U = t[jend:jend+1], u[:, None].copy()
+    if single:
+        U = U[..., 0]
+
+    # Finish the file on disk; the metadata records how many rows were written
+    if store is not None:
+        disk.flush()
+        meta['t'] = t
+        save_heat_meta(store, t.size, meta)
     
     # Return our pretty solution to the caller
+    if return_info:
+        # Drop the scenario axis again for a single run
+        squeeze = (lambda a: np.asarray(a)[..., 0]) if single else np.asarray
+        info = {'converged': squeeze(~np.isnan(spinup)), 'spinup_time': squeeze(spinup),
+                'envelope_change': squeeze(np.reshape(changes, (-1, S)))}
+        if single:
+            info['converged'], info['spinup_time'] = bool(info['converged']), float(info['spinup_time'])
+        if output == 'reduce':
+            if prev_max is None:  # no complete period, use the partial one
+                prev_max, prev_min, prev_mean = env_max, env_min, env_sum/max(jend, 1)
+            info.update({'summer': squeeze(prev_max), 'winter': squeeze(prev_min), 'mean': squeeze(prev_mean),
+                         'period_end': np.array(period_end),
+                         'active_layer': squeeze(np.reshape(active_layer, (-1, S))),
+                         'permafrost_depth': squeeze(np.reshape(permafrost, (-1, S)))})
+        return t,x,U,info
     return t,x,U
 
+def permafrost_depths(x, summer):
+    '''
+    Depth of the active layer and of the bottom of the permafrost from the summer (maximum) temperature profile: the permafrost is the ground that stays at or below 0 degree all year, so its top is the first and its bottom the last depth where the summer temperature is <= 0.
+
+    Parameter
+    --------------
+    x: 1D Numpy array
+        Depth values.
+    summer: Numpy array
+        Maximum temperature at each depth over a year, size nSpace or nSpace x nScenario.
+
+    Returns
+    --------------
+    active_layer, permafrost_depth: floats or 1D Numpy arrays
+        The two depths (one per scenario), nan if no depth stays frozen.
+    '''
+    frozen = np.asarray(summer) <= 0
+    top = np.argmax(frozen, axis=0)
+    bottom = frozen.shape[0] - 1 - np.argmax(frozen[::-1], axis=0)
+    found = frozen.any(axis=0)
+    return np.where(found, x[top], np.nan)[()], np.where(found, x[bottom], np.nan)[()]
+
+def scenario_bounds(bound):
+    '''
+    Whether a boundary condition given to `solve_heat` is a list of boundary conditions, one per scenario: a list or tuple containing at least one function, None or array. A list of numbers only is a series of one value per time step instead.
+    '''
+    return isinstance(bound, (list, tuple)) and any(b is None or callable(b) or np.ndim(b) > 0 for b in bound)
+
+def boundary_series(bound, t, steps=slice(None)):
+    '''
+    Values of a boundary condition at all the times `t` at once.
+
+    Parameter
+    --------------
+    bound: int, function, array or None
+        A constant, a function of time, an array with one value per time step of the whole run, or None (Neumann).
+    t: 1D Numpy array
+        Times to evaluate at.
+    steps: slice
+        Position of `t` within the run, used to pick the values of an array. Default is all.
+
+    Returns
+    --------------
+    values: 1D Numpy array or None
+        One value per time (None for a Neumann boundary).
+    '''
+    if bound is None: #Neumann
+        return None
+    elif callable(bound):  # is bound a function?
+        # Vectorized call; fall back to one call per time for functions of a scalar only
+        try:
+            values = np.asarray(bound(t), dtype=float)
+        except (TypeError, ValueError):
+            values = np.array([bound(ti) for ti in t], dtype=float)
+        return np.broadcast_to(values, t.shape)
+    elif np.ndim(bound) == 1: # values for every step
+        values = np.asarray(bound, dtype=float)[steps]
+        if values.size != t.size:
+            raise ValueError(f'Boundary array has {np.size(bound)} values, need one per time step.')
+        return values
+    return np.full(t.shape, bound, dtype=float) #Dirichlet/constant
+
+def periodic_forcing(values, period=365, times=None, t_shift=0):
+    '''
+    Turn one cycle of tabulated boundary temperatures into a function of time that repeats every `period` and interpolates linearly in between (wrapping around the end of the cycle), for use as a boundary of `solve_heat`.
+
+    Parameter
+    --------------
+    values: 1D array
+        Temperatures over one cycle.
+    period: float
+        Length of the cycle in day. Default is 365.
+    times: 1D array, optional
+        Time of each value within the cycle. Default is evenly spaced from 0.
+    t_shift: float
+        Uniform temperature shift added to every value. Default is 0.
+
+    Returns
+    --------------
+    forcing: function
+        forcing(t) gives the temperature for a time or an array of times.
+    '''
+    values = np.asarray(values, dtype=float) + t_shift
+    if times is None:
+        times = np.arange(values.size)*period/values.size
+
+    def forcing(t):
+        return np.interp(t, times, values, period=period)
+    return forcing
+
+def monthly_forcing(monthly, t_shift=0, year=365):
+    '''
+    Boundary temperature from a monthly climatology (12 monthly means, January first), each value placed at the middle of its month and interpolated periodically with `periodic_forcing`.
+
+    Parameter
+    --------------
+    monthly: 1D array
+        The 12 monthly mean temperatures.
+    t_shift: float
+        Uniform temperature shift (e.g., due to global warming). Default is 0.
+    year: float
+        Length of the year in day. Default is 365.
+
+    Returns
+    --------------
+    forcing: function
+        forcing(t) gives the temperature for a time or an array of times.
+    '''
+    if np.size(monthly) != 12:
+        raise ValueError(f'Need 12 monthly values, got {np.size(monthly)}.')
+    return periodic_forcing(monthly, year, (np.arange(12) + 0.5)*year/12, t_shift)
+
+def boundary_spec(bound):
+    '''
+    Text description of a boundary condition, as saved in the metadata of a stored run: 'neumann', 'dirichlet <value>' or 'function <name>'.
+    '''
+    if bound is None:
+        return 'neumann'
+    elif callable(bound):
+        return f"function {getattr(bound, '__name__', repr(bound))}"
+    elif scenario_bounds(bound): # one per scenario
+        return [boundary_spec(b) for b in bound]
+    elif np.ndim(bound) == 1:
+        return 'series'
+    return f'dirichlet {bound}'
+
+def save_heat_meta(store, rows, meta):
+    '''
+    Write the metadata of a stored run to `meta.npz` in `store`, together with the number of rows of `history.npy` written so far. The file is written under a temporary name and then renamed, so readers never see a partly written file.
+    '''
+    np.savez(os.path.join(store, 'meta.tmp.npz'), rows=rows, **meta)
+    os.replace(os.path.join(store, 'meta.tmp.npz'), os.path.join(store, 'meta.npz'))
+
+def load_heat_history(store, depth=None, time=None):
+    '''
+    Open a run saved by `solve_heat(..., store=...)` without reading it into memory. Only the requested depth and time window is sliced out of the memory-mapped file, and the data are read from disk when they are used.
+
+    Parameter
+    --------------
+    store: string
+        Directory given to `solve_heat`.
+    depth: tuple, optional
+        (min, max) depth in meter to keep. Default is all depths.
+    time: tuple, optional
+        (min, max) time in day to keep. Default is all times.
+
+    Returns
+    --------------
+    t, x: 1D Numpy arrays
+        Time and space values of the window.
+
+    U : Numpy memmap
+        The temperatures in the window, size is nSpace x nTime (x nScenario), a view of the file.
+
+    meta : dict
+        Everything saved with the run: x, t (all planned times), rows (number of times written so far), c2, dx, dt, method, lowerbound and upperbound.
+    '''
+    with np.load(os.path.join(store, 'meta.npz')) as f:
+        meta = {key: f[key] if f[key].ndim else f[key].item() for key in f.files}
+    x, t = meta['x'], meta['t'][:meta['rows']]
+    U = np.load(os.path.join(store, 'history.npy'), mmap_mode='r')
+
+    # Index ranges of the windows (only rows already written, which after an early stop ends before the file does)
+    ix, it = slice(None), slice(0, t.size)
+    if depth is not None:
+        ix = slice(np.searchsorted(x, depth[0], side='left'), np.searchsorted(x, depth[1], side='right'))
+    if time is not None:
+        it = slice(np.searchsorted(t, time[0], side='left'), np.searchsorted(t, time[1], side='right'))
+    return t[it], x[ix], np.moveaxis(U[it, ix], 0, 1), meta
+
+def heat_factor(M, r, theta, neumann_lower=False, neumann_upper=False):
+    '''
+    Build and LU-factorize the tridiagonal matrix of an implicit heat equation step,
+        -theta*r*U[i-1] + (1+2*theta*r)*U[i] - theta*r*U[i+1] = right-hand side
+    with theta = 1 for backward Euler and theta = 0.5 for Crank-Nicolson. The boundary rows are U[0] = value (Dirichlet) or U[0] - U[1] = 0 (Neumann), and likewise at the other end.
+
+    Parameter
+    --------------
+    M: int
+        Number of grid points.
+    r: float
+        c2*dt/dx**2.
+    theta: float
+        Implicitness of the scheme.
+    neumann_lower, neumann_upper: bool
+        Whether each boundary is a Neumann (zero gradient) condition.
+
+    Returns
+    --------------
+    lu : tuple
+        The LU factors, for `heat_solve_factored`.
+    '''
+    from scipy.linalg.lapack import dgttrf
+
+    lower = np.full(M-1, -theta*r)
+    diag = np.full(M, 1 + 2*theta*r)
+    upper = np.full(M-1, -theta*r)
+    diag[0] = diag[-1] = 1
+    upper[0] = -1 if neumann_lower else 0
+    lower[-1] = -1 if neumann_upper else 0
+
+    *lu, info = dgttrf(lower, diag, upper)
+    if info != 0:
+        raise ValueError(f'Singular heat equation matrix (LAPACK info = {info}).')
+    return tuple(lu)
+
+def heat_solve_factored(lu, rhs):
+    '''
+    Solve the tridiagonal system factorized by `heat_factor` for the right-hand side `rhs` (one column per system if 2D).
+    '''
+    from scipy.linalg.lapack import dgttrs
+
+    x, info = dgttrs(*lu, rhs)
+    return x
+
 def plot_heatsolve(t,x,U,title=None, cmap = 'inferno', fig=None, ax=None,**kwargs):
     '''
     plot the 2D solutions 
@@ -137,13 +545,15 @@ def plot_heatsolve(t,x,U,title=None, cmap = 'inferno', fig=None, ax=None,**kwarg
 
     return fig, ax, cbar
 
+# Kangerlussuaq average monthly temperature, its mean and amplitude:
+t_kanger = np.array([-19.7, -21.0, -17., -8.4, 2.3, 8.4,
+10.7, 8.5, 3.1, -6.0, -12.0, -16.9])
+t_kanger_mean = t_kanger.mean()
+t_kanger_amp = (t_kanger - t_kanger_mean).max()
+
 def temp_kanger(t, t_shift = 0):
     '''
     For an array of times in days, return timeseries of temperature for Kangerlussuaq, Greenland. Any shift of temperature (e.g., due to global warming) can be added using t_shift.
     
     '''
-    # Kangerlussuaq average temperature:
-    t_kanger = np.array([-19.7, -21.0, -17., -8.4, 2.3, 8.4,
-    10.7, 8.5, 3.1, -6.0, -12.0, -16.9])
-    t_amp = (t_kanger - t_kanger.mean()).max()
-    return t_amp*np.sin(np.pi/180 * t - np.pi/2) + t_kanger.mean() + t_shift
+    return t_kanger_amp*np.sin(np.pi/180 * t - np.pi/2) + t_kanger_mean + t_shift
@@ -17,9 +17,18 @@ from lab3_1_functions import solve_heat, plot_heatsolve, temp_kanger
 c2_2 = 0.25*1E-6*60*60*24 #m^2/day
 days_2 = 50*365
 dt_2 = 1
+# Steady state: no depth changes its yearly min/max by more than this (°C) from one year to the next.
+# The base of the permafrost still deepens by about 1 m per century after that (the deep ground relaxes over
+# thousands of years), but at 0.04°C the reported depths are those of the 50-year run and stay so for decades.
+tol_2 = 0.04
 
-#------> Solve for solutions
-t_2,x_2,U_2 = solve_heat(xstop=100, tstop = days_2, dx=1, dt = dt_2, c2 = c2_2,lowerbound=temp_kanger,upperbound=5)
+#------> Solve until steady state (at most 50 years); the arrays end at the first steady year
+t_2,x_2,U_2,info_2 = solve_heat(xstop=100, tstop = days_2, dx=1, dt = dt_2, c2 = c2_2,lowerbound=temp_kanger,upperbound=5,
+                                steady_tol=tol_2, period=365, return_info=True)
+if info_2['converged']:
+    print(f"The ground reaches a steady state after about {info_2['spinup_time']/365:.0f} years (yearly change < {tol_2}°C).")
+else:
+    print(f"No steady state within {days_2/365:.0f} years (last yearly change {info_2['envelope_change'][-1]:.3f}°C).")
 
 #------> Get summer and winter values
 # Set indexing for the final year of results:
@@ -22,8 +22,12 @@ dt_3 = 1
 t_shifts = [0.5, 1, 3]
 results = {}
 
-for t_sh in t_shifts:
-    t_, x_, U_ = solve_heat(xstop=100, tstop = days_3, dx=1, dt = dt_3, c2 = c2_3,lowerbound=lambda t: temp_kanger(t, t_shift=t_sh),upperbound=5)
+# All shifts are run together as scenarios of one batched solve; U_all is nSpace x nTime x nShift
+t_, x_, U_all = solve_heat(xstop=100, tstop = days_3, dx=1, dt = dt_3, c2 = c2_3,
+                           lowerbound=[lambda t, t_sh=t_sh: temp_kanger(t, t_shift=t_sh) for t_sh in t_shifts],upperbound=5)
+
+for i_sh, t_sh in enumerate(t_shifts):
+    U_ = U_all[:, :, i_sh]
 
     #------> Get summer and winter values
     # Set indexing for the final year of results: